@@ -0,0 +1,155 @@
+# aggregation.py
+# Columnar group-by for scored articles: count, sum and sum of squares of both scores per
+# journal, topic tag, ISO week, week x topic and overall, computed from one set of column
+# arrays. numpy does the group sums with bincount; without numpy (or for small inputs,
+# where its overhead dominates) the same totals come from a plain Python loop. Groups are
+# returned in order of first appearance, with "first" giving the row (or, for tag
+# dimensions, the exploded row/tag) index where each group first occurs.
+from datetime import datetime
+from importlib.util import find_spec
+
+# numpy is optional (the pure-Python path gives the same results) and is imported only
+# when a large enough input needs it, so importing this module stays cheap.
+HAS_NUMPY = find_spec("numpy") is not None
+
+NUMPY_MIN_ROWS = 2048
+TOTAL_FIELDS = ("n", "rs_n", "rs_sum", "rs_sumsq", "is_n", "is_sum", "is_sumsq")
+
+def iso_week(run_date):
+    try:
+        iso = datetime.strptime(run_date, "%Y-%m-%d").isocalendar()
+    except (TypeError, ValueError):
+        return "unknown"
+    return f"{iso.year}-W{iso.week:02d}"
+
+def factorize(values):
+    # Codes in order of first appearance, plus the distinct values and where each first occurs.
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    first = [0] * len(index)
+    found = 0
+    for position, code in enumerate(codes):
+        # Codes are handed out in order, so a group's first row is where its code == found.
+        if code == found:
+            first[code] = position
+            found += 1
+            if found == len(first):
+                break
+    return codes, list(index), first
+
+def factorize_numpy(codes):
+    # factorize() for an integer array, via np.unique re-ranked by first appearance.
+    import numpy as np
+
+    uniques, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], uniques[order].tolist(), first[order].tolist()
+
+def explode_tags(topic_tags):
+    # One entry per (article, tag) pair, in article order then tag order.
+    rows = [row for row, row_tags in enumerate(topic_tags) for _ in row_tags]
+    tags = [tag for row_tags in topic_tags for tag in row_tags]
+    return rows, tags
+
+def totals_python(codes, n_groups, research, impact):
+    totals = {field: [0] * n_groups if field in ("n", "rs_n", "is_n") else [0.0] * n_groups for field in TOTAL_FIELDS}
+    n, rs_n, rs_sum, rs_sumsq = totals["n"], totals["rs_n"], totals["rs_sum"], totals["rs_sumsq"]
+    is_n, is_sum, is_sumsq = totals["is_n"], totals["is_sum"], totals["is_sumsq"]
+    for code, rs, im in zip(codes, research, impact):
+        n[code] += 1
+        if rs is not None:
+            rs_n[code] += 1
+            rs_sum[code] += rs
+            rs_sumsq[code] += rs * rs
+        if im is not None:
+            is_n[code] += 1
+            is_sum[code] += im
+            is_sumsq[code] += im * im
+    return totals
+
+def totals_numpy(codes, n_groups, research, impact):
+    # research/impact are float arrays with NaN for missing scores. bincount adds the
+    # weights in index order, so the sums match the Python loop exactly.
+    import numpy as np
+
+    codes = np.asarray(codes, dtype=np.intp)
+    totals = {"n": np.bincount(codes, minlength=n_groups)}
+    for prefix, scores in (("rs", research), ("is", impact)):
+        present = ~np.isnan(scores)
+        values = np.where(present, scores, 0.0)
+        totals[f"{prefix}_n"] = np.bincount(codes, weights=present, minlength=n_groups).astype(np.int64)
+        totals[f"{prefix}_sum"] = np.bincount(codes, weights=values, minlength=n_groups)
+        totals[f"{prefix}_sumsq"] = np.bincount(codes, weights=values * values, minlength=n_groups)
+    return {field: values.tolist() for field, values in totals.items()}
+
+def build_groups(keys, subkeys, first, totals):
+    return [
+        dict(
+            {"key": key, "subkey": subkey, "first": position},
+            **{field: totals[field][code] for field in TOTAL_FIELDS},
+        )
+        for code, (key, subkey, position) in enumerate(zip(keys, subkeys, first))
+    ]
+
+def aggregate(run_dates, journals, research, impact, topic_tags, use_numpy=None):
+    # All arguments are columns with one entry per article: run date, journal ("" for
+    # none), research and impact score (None for N/A) and the list of topic tags.
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY and len(run_dates) >= NUMPY_MIN_ROWS
+    n_rows = len(run_dates)
+
+    # Weeks are derived from the (few) distinct dates; date codes are in first-appearance
+    # order, so a week's first date also gives its first row.
+    date_codes, dates, date_first = factorize(run_dates)
+    week_of_date, weeks, week_first_date = factorize([iso_week(date) for date in dates])
+    week_first = [date_first[code] for code in week_first_date]
+    journal_codes, journal_keys, journal_first = factorize(journals)
+    tag_rows, tags = explode_tags(topic_tags)
+    tag_codes, tag_keys, tag_first = factorize(tags)
+
+    if use_numpy:
+        import numpy as np
+
+        rs = np.array([np.nan if v is None else v for v in research], dtype=float)
+        im = np.array([np.nan if v is None else v for v in impact], dtype=float)
+        rows = np.asarray(tag_rows, dtype=np.intp)
+        tag_rs, tag_im = rs[rows], im[rows]
+        week_codes = np.asarray(week_of_date, dtype=np.intp)[np.asarray(date_codes, dtype=np.intp)]
+        week_tag_codes, pair_codes, week_tag_first = factorize_numpy(
+            week_codes[rows] * max(len(tag_keys), 1) + np.asarray(tag_codes, dtype=np.intp)
+        )
+        week_tag_pairs = [divmod(code, max(len(tag_keys), 1)) for code in pair_codes]
+        totals = totals_numpy
+    else:
+        rs, im = research, impact
+        tag_rs = [research[row] for row in tag_rows]
+        tag_im = [impact[row] for row in tag_rows]
+        week_codes = [week_of_date[code] for code in date_codes]
+        week_tag_codes, week_tag_pairs, week_tag_first = factorize(
+            [(week_codes[row], tag) for row, tag in zip(tag_rows, tag_codes)]
+        )
+        totals = totals_python
+
+    # Articles without a journal are left out of the journal table.
+    journal_totals = totals(journal_codes, len(journal_keys), rs, im)
+    if "" in journal_keys:
+        skip = journal_keys.index("")
+        keep = [code for code in range(len(journal_keys)) if code != skip]
+        journal_totals = {field: [values[code] for code in keep] for field, values in journal_totals.items()}
+        journal_first = [journal_first[code] for code in keep]
+        journal_keys = [journal_keys[code] for code in keep]
+
+    return {
+        "global": build_groups([""], [""], [0], totals([0] * n_rows, 1, rs, im)) if n_rows else [],
+        "journal": build_groups(journal_keys, [""] * len(journal_keys), journal_first, journal_totals),
+        "topic": build_groups(tag_keys, [""] * len(tag_keys), tag_first, totals(tag_codes, len(tag_keys), tag_rs, tag_im)),
+        "week": build_groups(weeks, [""] * len(weeks), week_first, totals(week_codes, len(weeks), rs, im)),
+        "week_topic": build_groups(
+            [weeks[week] for week, _ in week_tag_pairs],
+            [tag_keys[tag] for _, tag in week_tag_pairs],
+            week_tag_first,
+            totals(week_tag_codes, len(week_tag_pairs), tag_rs, tag_im),
+        ),
+    }
@@ -0,0 +1,67 @@
+# benchmarks/bench_abstract.py
+# Times update.reconstruct_abstract against the original sort-based decoder on
+# abstract_inverted_index payloads built from the abstracts in data/weekly, and checks
+# both decode every payload to the same text.
+#
+#   python benchmarks/bench_abstract.py [--scales 1 4 16] [--repeat 5]
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_services import DATA_DIR, to_inverted_index  # noqa: E402
+from update import reconstruct_abstract  # noqa: E402
+
+def legacy_reconstruct_abstract(inverted_index):
+    # The original decoder: every (position, word) pair, sorted.
+    if not inverted_index:
+        return ""
+
+    words = []
+    for word, positions in inverted_index.items():
+        for position in positions:
+            words.append((position, word))
+
+    return " ".join(word for _, word in sorted(words))
+
+def fixture_abstracts():
+    abstracts = []
+    for path in sorted(DATA_DIR.glob("????-??-??.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")):
+            if isinstance(item, dict) and item.get("abstract"):
+                abstracts.append(item["abstract"])
+    return abstracts
+
+def per_payload_us(decode, payloads, repeat):
+    best = min(timeit.repeat(lambda: [decode(p) for p in payloads], number=20, repeat=repeat))
+    return best / 20 / len(payloads) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16], help="abstract length multipliers")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    abstracts = fixture_abstracts()
+    print(f"fixture abstracts: {len(abstracts)}")
+    print("| scale | words/abstract | legacy us | position fill us | speedup |")
+    print("|---|---|---|---|---|")
+    for scale in args.scales:
+        payloads = [to_inverted_index(" ".join([text] * scale)) for text in abstracts]
+        for payload in payloads:
+            assert reconstruct_abstract(payload) == legacy_reconstruct_abstract(payload)
+        words = sum(sum(map(len, p.values())) for p in payloads) / len(payloads)
+        legacy = per_payload_us(legacy_reconstruct_abstract, payloads, args.repeat)
+        fill = per_payload_us(reconstruct_abstract, payloads, args.repeat)
+        print(f"| {scale} | {words:.0f} | {legacy:.1f} | {fill:.1f} | {legacy / fill:.1f}x |")
+    print("decoded text identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# benchmarks/bench_audit.py
+# Compares the columnar aggregation engine (aggregation.py) plus render_report with the
+# original record-by-record monthly audit on synthetic scored articles, and checks both
+# produce the same report.
+#
+#   python benchmarks/bench_audit.py [--rows 100000] [--weeks 104]
+from __future__ import annotations
+
+import argparse
+import random
+import statistics as stats
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import aggregation  # noqa: E402
+from aggregation import aggregate, iso_week  # noqa: E402
+from monthly_audit import render_report  # noqa: E402
+
+TOPIC_TAGS = [
+    "attention",
+    "self_control",
+    "value_based_choice",
+    "deception_dishonesty",
+    "social_decision",
+    "learning",
+    "memory",
+    "emotion",
+    "risk_uncertainty",
+    "metacognition",
+]
+
+def legacy_mean_or_none(vals):
+    vals = [v for v in vals if v is not None]
+    return round(stats.mean(vals), 2) if vals else None
+
+def legacy_report(records, run_dates, now):
+    # The original monthly_audit.main, minus file I/O: one Python pass per table.
+
+    # ---- Global summary ----
+    rs_all = [r["research_score"] for r in records if r["research_score"] is not None]
+    is_all = [r["impact_score"] for r in records if r["impact_score"] is not None]
+
+    # ---- Journal bias table ----
+    by_journal = defaultdict(list)
+    for r in records:
+        if r["journal"]:
+            by_journal[r["journal"]].append(r)
+
+    journal_rows = []
+    global_rs = stats.mean(rs_all) if rs_all else None
+    global_is = stats.mean(is_all) if is_all else None
+
+    for j, rows in by_journal.items():
+        rs = legacy_mean_or_none([x["research_score"] for x in rows])
+        im = legacy_mean_or_none([x["impact_score"] for x in rows])
+        n = len(rows)
+        rs_delta = round(rs - global_rs, 2) if (rs is not None and global_rs is not None) else None
+        im_delta = round(im - global_is, 2) if (im is not None and global_is is not None) else None
+        journal_rows.append((n, j, rs, rs_delta, im, im_delta))
+
+    journal_rows.sort(reverse=True, key=lambda x: x[0])  # by N desc
+
+    # ---- Topic trend (last 26 weeks) ----
+    # Build week -> tag -> list(scores)
+    week_tag_rs = defaultdict(lambda: defaultdict(list))
+    week_tag_is = defaultdict(lambda: defaultdict(list))
+
+    for r in records:
+        wk = iso_week(r["run_date"])
+        tags = r["topic_tags"] if isinstance(r["topic_tags"], list) else []
+        for t in tags:
+            week_tag_rs[wk][t].append(r["research_score"])
+            week_tag_is[wk][t].append(r["impact_score"])
+
+    all_weeks = sorted([iso_week(d) for d in run_dates])
+    all_weeks = sorted(set(all_weeks))
+    last_weeks = all_weeks[-26:] if len(all_weeks) > 26 else all_weeks
+
+    # Aggregate overall topic stats
+    by_topic = defaultdict(list)
+    for r in records:
+        tags = r["topic_tags"] if isinstance(r["topic_tags"], list) else []
+        for t in tags:
+            by_topic[t].append(r)
+
+    topic_rows = []
+    for t, rows in by_topic.items():
+        rs = legacy_mean_or_none([x["research_score"] for x in rows])
+        im = legacy_mean_or_none([x["impact_score"] for x in rows])
+        n = len(rows)
+        topic_rows.append((n, t, rs, im))
+    topic_rows.sort(reverse=True, key=lambda x: x[0])
+
+    lines = []
+    lines.append(f"# Monthly Audit Report ({now})\n")
+    lines.append(f"- Data files: {len(run_dates)} weekly snapshots\n")
+    lines.append(f"- Articles scored (rows): {len(records)}\n")
+    lines.append(f"- Global mean Research Score: {round(global_rs,2) if global_rs is not None else 'N/A'}\n")
+    lines.append(f"- Global mean Impact Score: {round(global_is,2) if global_is is not None else 'N/A'}\n")
+
+    # Journal table
+    lines.append("\n## Journal Summary (by volume)\n")
+    lines.append("| N | Journal | Mean Research | Δ vs Global | Mean Impact | Δ vs Global |\n")
+    lines.append("|---:|---|---:|---:|---:|---:|\n")
+    for n, j, rs, rsd, im, imd in journal_rows[:30]:
+        lines.append(f"| {n} | {j} | {rs if rs is not None else 'N/A'} | {rsd if rsd is not None else 'N/A'} | {im if im is not None else 'N/A'} | {imd if imd is not None else 'N/A'} |\n")
+
+    # Topic table
+    lines.append("\n## Topic Summary (by volume)\n")
+    lines.append("| N | Topic Tag | Mean Research | Mean Impact |\n")
+    lines.append("|---:|---|---:|---:|\n")
+    for n, t, rs, im in topic_rows[:30]:
+        lines.append(f"| {n} | {t} | {rs if rs is not None else 'N/A'} | {im if im is not None else 'N/A'} |\n")
+
+    # Trend section (compact)
+    lines.append("\n## Topic Trend (last 26 weeks, weekly means)\n")
+    lines.append(f"Weeks covered: {', '.join(last_weeks) if last_weeks else 'N/A'}\n\n")
+    # pick top 6 topics by volume to keep readable
+    top_topics = [t for _, t, _, _ in topic_rows[:6]]
+    if not top_topics or not last_weeks:
+        lines.append("_Not enough data to compute trends._\n")
+    else:
+        lines.append("### Research Score trend\n")
+        lines.append("| Week | " + " | ".join(top_topics) + " |\n")
+        lines.append("|---|"+ "|".join(["---:"] * len(top_topics)) + "|\n")
+        for wk in last_weeks:
+            row = []
+            for t in top_topics:
+                m = legacy_mean_or_none(week_tag_rs[wk].get(t, []))
+                row.append(str(m) if m is not None else "")
+            lines.append(f"| {wk} | " + " | ".join(row) + " |\n")
+
+        lines.append("\n### Impact Score trend\n")
+        lines.append("| Week | " + " | ".join(top_topics) + " |\n")
+        lines.append("|---|"+ "|".join(["---:"] * len(top_topics)) + "|\n")
+        for wk in last_weeks:
+            row = []
+            for t in top_topics:
+                m = legacy_mean_or_none(week_tag_is[wk].get(t, []))
+                row.append(str(m) if m is not None else "")
+            lines.append(f"| {wk} | " + " | ".join(row) + " |\n")
+
+    return "".join(lines)
+
+def synthetic_records(n, weeks, seed=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 6)
+    run_dates = [(start + timedelta(weeks=i)).isoformat() for i in range(weeks)]
+    journals = [f"Journal of Synthetic Studies {i}" for i in range(400)]
+
+    def score():
+        return None if rng.random() < 0.05 else float(rng.randint(20, 95))
+
+    records = []
+    for i in range(n):
+        records.append({
+            "run_date": run_dates[i * weeks // n],
+            "journal": "" if rng.random() < 0.02 else journals[min(int(rng.paretovariate(1.2)) - 1, len(journals) - 1)],
+            "research_score": score(),
+            "impact_score": score(),
+            "topic_tags": rng.sample(TOPIC_TAGS, rng.randint(0, 3)),
+        })
+    return records, run_dates
+
+def engine_report(records, run_dates, now, use_numpy):
+    groups = aggregate(
+        [r["run_date"] for r in records],
+        [r["journal"] for r in records],
+        [r["research_score"] for r in records],
+        [r["impact_score"] for r in records],
+        [r["topic_tags"] for r in records],
+        use_numpy=use_numpy,
+    )
+    return render_report(groups, run_dates, now)
+
+def bench(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--weeks", type=int, default=104)
+    args = parser.parse_args()
+
+    records, run_dates = synthetic_records(args.rows, args.weeks)
+    now = "2026-01"
+
+    legacy_out, legacy_s = bench(legacy_report, records, run_dates, now)
+    python_out, python_s = bench(engine_report, records, run_dates, now, False)
+    assert python_out == legacy_out, "pure-Python engine report differs from the original audit"
+
+    print(f"rows: {len(records)}  weeks: {len(run_dates)}")
+    print(f"legacy:        {legacy_s:.3f}s")
+    print(f"engine/python: {python_s:.3f}s  ({legacy_s / python_s:.1f}x)")
+    if aggregation.HAS_NUMPY:
+        numpy_out, numpy_s = bench(engine_report, records, run_dates, now, True)
+        assert numpy_out == legacy_out, "numpy engine report differs from the original audit"
+        print(f"engine/numpy:  {numpy_s:.3f}s  ({legacy_s / numpy_s:.1f}x)")
+    print("reports identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_neardup.py
+# Near-duplicate lookups against the history store (history.py + neardup.py) at tens of
+# thousands of stored articles: ingest synthetic snapshots, then time lookups for lightly
+# edited copies of stored articles (which should match) and for fresh articles (which
+# should not), next to a brute-force scan over every stored signature.
+#
+#   python benchmarks/bench_neardup.py [--records 50000] [--queries 1000]
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from history import HistoryStore  # noqa: E402
+from neardup import SIMILARITY_THRESHOLD, signature, similarity, unpack_signature  # noqa: E402
+
+def make_vocabulary(rng, size=5000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+def synthetic_article(rng, vocabulary, i):
+    return {
+        "title": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(8, 16))),
+        "abstract": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(120, 220))),
+        "journal": f"Journal of Synthetic Studies {i % 300}",
+        "doi": f"10.5555/neardup.{i}",
+        "research_score": 60,
+        "impact_score": 60,
+        "topic_tags": [],
+    }
+
+def edited_copy(rng, vocabulary, article, share=0.03):
+    # A corrected record / preprint twin: a few words swapped, new DOI.
+    words = article["abstract"].split()
+    for position in rng.sample(range(len(words)), max(1, int(len(words) * share))):
+        words[position] = rng.choice(vocabulary)
+    return {"title": article["title"], "abstract": " ".join(words)}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--weeks", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    articles = [synthetic_article(rng, vocabulary, i) for i in range(args.records)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(Path(tmp) / "history.sqlite")
+        start = time.perf_counter()
+        conn = store.connect()
+        with conn:
+            per_week = -(-len(articles) // args.weeks)
+            for week in range(args.weeks):
+                run_date = (date(2024, 1, 6) + timedelta(weeks=week)).isoformat()
+                store.ingest(conn, run_date, articles[week * per_week:(week + 1) * per_week], "-", 0, 0)
+        conn.close()
+        ingest_s = time.perf_counter() - start
+
+        half = args.queries // 2
+        sources = rng.sample(articles, half)
+        queries = [edited_copy(rng, vocabulary, a) for a in sources]
+        queries += [synthetic_article(rng, vocabulary, args.records + i) for i in range(args.queries - half)]
+
+        start = time.perf_counter()
+        signatures = [signature(q["title"], q["abstract"]) for q in queries]
+        signature_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = store.near_duplicates(signatures)
+        lookup_s = time.perf_counter() - start
+
+        found = sum(match is not None and match["doi"] == a["doi"] for match, a in zip(matches, sources))
+        false_positives = sum(match is not None for match in matches[half:])
+
+        # Brute force over every stored signature, for a handful of queries.
+        conn = store.connect()
+        stored = [unpack_signature(blob) for (blob,) in conn.execute("SELECT signature FROM article_minhash")]
+        conn.close()
+        scan_queries = signatures[:20]
+        start = time.perf_counter()
+        for sig in scan_queries:
+            max(similarity(sig, other) for other in stored) >= SIMILARITY_THRESHOLD
+        scan_s = (time.perf_counter() - start) / len(scan_queries)
+
+    print(f"stored articles: {len(articles)}  queries: {len(queries)}")
+    print(f"ingest:           {ingest_s:.2f}s ({ingest_s / len(articles) * 1000:.3f} ms/article)")
+    print(f"signature:        {signature_s / len(queries) * 1000:.3f} ms/query")
+    print(f"LSH lookup:       {lookup_s / len(queries) * 1000:.3f} ms/query")
+    print(f"brute-force scan: {scan_s * 1000:.1f} ms/query")
+    print(f"edited copies found: {found}/{half}  false positives: {false_positives}/{len(queries) - half}")
+
+if __name__ == "__main__":
+    main()
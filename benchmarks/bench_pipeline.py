@@ -0,0 +1,139 @@
+# benchmarks/bench_pipeline.py
+# End-to-end benchmark of the weekly pipeline against benchmarks/fake_services.py.
+# For each corpus size the pipeline runs in a fresh subprocess (so peak RSS is per
+# size) inside a scratch directory, through the same stages as update.run_profile, and
+# reports wall-clock and requests/s per stage. ru_maxrss is a process-wide high-water
+# mark, so per stage it gives the peak so far (cumulative) and how much the stage raised it.
+#
+#   python benchmarks/bench_pipeline.py [--sizes 30 300 3000] [--latency 0.02] [--error-rate 0.0]
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+def fetch_counters(base_url):
+    with urllib.request.urlopen(f"{base_url}/_counters") as response:
+        return json.loads(response.read())
+
+def run_child(args):
+    # Runs inside the scratch directory; relative data/ and .cache/ paths land there.
+    import update
+
+    n = args.child
+    keyword_count = sum(len(keywords) for keywords in update.OPENALEX_QUERIES.values())
+    update.OPENALEX_PER_KEYWORD_LIMIT = math.ceil(n / keyword_count)
+    update.OPENALEX_MAX_ARTICLES = n
+    update.PRERANK_POOL_LIMIT = n
+    update.OPENALEX_CACHE_TTL = 0
+    update.openalex_api_key = "bench"
+    update.deepseekapikey = "bench"
+    update.access_token = "bench"
+    if args.no_rate_limit:
+        update.openalex_rate_limiter = update.TokenBucket(1e9)
+
+    base_url = update.OPENALEX_BASE_URL
+    run_date = "2026-01-01"
+    run_dir = update.RUN_CHECKPOINT_DIR / run_date
+    stages = []
+    state = {}
+
+    def stage(name, counter, fn):
+        before = fetch_counters(base_url)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        state[name] = fn()
+        seconds = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        requests_made = fetch_counters(base_url)[counter] - before[counter] if counter else 0
+        stages.append({
+            "stage": name,
+            "seconds": round(seconds, 3),
+            "requests": requests_made,
+            "requests_per_s": round(requests_made / seconds, 1) if seconds and requests_made else 0,
+            "cumulative_peak_rss_mb": round(rss_after / 1024, 1),
+            "peak_rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        })
+
+    # The same stages, in the same order, as update.run_profile for the built-in profile.
+    stage("fetch", "openalex", lambda: update.fetch_stage(run_date))
+    articles, filter_stats = state["fetch"][update.DEFAULT_PROFILE]
+    stage("dedupe", None, lambda: update.dedupe_stage(articles, run_date))
+    stage("prerank", None, lambda: update.prerank_stage(state["dedupe"], run_date))
+    stage("score", "llm", lambda: update.score_stage(state["prerank"], run_dir))
+    scored_articles = state["score"]
+    stage("snapshot", None, lambda: update.write_snapshot(run_date, scored_articles, filter_stats))
+    stage("render", None, lambda: update.render_stage(run_dir, run_date, scored_articles))
+    issue_title, pages = state["render"]
+    stage("publish", "github", lambda: update.publish_issue(run_dir, run_date, issue_title, pages))
+
+    print(json.dumps({"candidates": len(articles), "stages": stages}))
+
+def run_size(n, args):
+    from fake_services import FakeServices
+    import update
+
+    keywords = [keyword for keywords in update.OPENALEX_QUERIES.values() for keyword in keywords]
+    services = FakeServices(
+        works=n,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        payload_scale=args.payload_scale,
+        keywords=keywords,
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, **services.env())
+            cmd = [sys.executable, str(Path(__file__).resolve()), "--child", str(n)]
+            if args.no_rate_limit:
+                cmd.append("--no-rate-limit")
+            out = subprocess.run(cmd, cwd=workdir, env=env, check=True, capture_output=True, text=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        services.stop()
+    result["works"] = n
+    result["server"] = services.snapshot_counters()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=float, default=1.0)
+    parser.add_argument("--no-rate-limit", action="store_true", help="lift the OpenAlex token bucket")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args)
+
+    results = [run_size(n, args) for n in args.sizes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("| Works | Candidates | Stage | Seconds | Requests | Req/s | Peak RSS so far (MB) | Stage raised it by (MB) |")
+    print("|---:|---:|---|---:|---:|---:|---:|---:|")
+    for result in results:
+        for s in result["stages"]:
+            print(
+                f"| {result['works']} | {result['candidates']} | {s['stage']} | {s['seconds']} | "
+                f"{s['requests']} | {s['requests_per_s']} | {s['cumulative_peak_rss_mb']} | {s['peak_rss_growth_mb']} |"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_relevance.py
+# Compares the compiled relevance matcher with the original per-call matcher on
+# synthetic works built from data/weekly, and checks both return the same lists.
+#
+#   python benchmarks/bench_relevance.py [--works 10000]
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from relevance import (  # noqa: E402
+    RELEVANCE_RULES,
+    STRONG_TITLE_TERMS,
+    normalize_for_match,
+    relevance_matches,
+)
+
+def legacy_normalize_for_match(x):
+    x = re.sub(r"<[^>]+>", " ", x or "").strip().lower()
+    x = re.sub(r"[-_/]", " ", x)
+    x = re.sub(r"[^a-z0-9\s]", " ", x)
+    return re.sub(r"\s+", " ", x).strip()
+
+def legacy_matched_terms(text, terms):
+    return [term for term in terms if legacy_normalize_for_match(term) in text]
+
+def legacy_relevance_matches(query_name, title, abstract):
+    rule = RELEVANCE_RULES.get(query_name)
+    if not rule:
+        return []
+    if len(legacy_normalize_for_match(abstract).split()) < 30:
+        title_text = legacy_normalize_for_match(title)
+        if not legacy_matched_terms(title_text, STRONG_TITLE_TERMS.get(query_name, [])):
+            return []
+    text = legacy_normalize_for_match(f"{title} {abstract}")
+    if legacy_matched_terms(text, rule.get("exclude", [])):
+        return []
+    core_matches = legacy_matched_terms(text, rule["core"])
+    domain_matches = legacy_matched_terms(text, rule["domain"])
+    if core_matches and domain_matches:
+        return sorted(set(core_matches + domain_matches))
+    return []
+
+def synthetic_works(n, seed=0):
+    texts = []
+    for path in sorted((ROOT / "data" / "weekly").glob("????-??-??.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")):
+            texts.append((item.get("title") or "", item.get("abstract") or ""))
+
+    rng = random.Random(seed)
+    words = " ".join(f"{t} {a}" for t, a in texts).split()
+    works = []
+    for _ in range(n):
+        title, abstract = rng.choice(texts)
+        # Every work gets a unique tail so nothing is served from the normalize cache
+        # except the repeats a real run also has (one work checked against each rule).
+        tail = " ".join(rng.choice(words) for _ in range(rng.randint(0, 250)))
+        works.append((title, f"{abstract} {tail}".strip()))
+    return works
+
+def bench(fn, works):
+    start = time.perf_counter()
+    out = [fn(query_name, title, abstract) for title, abstract in works for query_name in RELEVANCE_RULES]
+    return time.perf_counter() - start, out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--works", type=int, default=10000)
+    args = parser.parse_args()
+
+    works = synthetic_works(args.works)
+    # Cheap sanity check that the one-pass normalization is identical to the old four passes.
+    for title, abstract in works[:500]:
+        text = f"{title} {abstract}"
+        if normalize_for_match(text) != legacy_normalize_for_match(text):
+            raise SystemExit("normalize_for_match changed its output")
+    normalize_for_match.cache_clear()
+
+    legacy_s, legacy_out = bench(legacy_relevance_matches, works)
+    compiled_s, compiled_out = bench(relevance_matches, works)
+
+    if legacy_out != compiled_out:
+        raise SystemExit("compiled matcher returned different match lists")
+
+    matched = sum(1 for m in compiled_out if m)
+    print(f"works: {len(works)}  rule checks: {len(compiled_out)}  matched: {matched}")
+    print(f"legacy:   {legacy_s:.3f}s")
+    print(f"compiled: {compiled_s:.3f}s  ({legacy_s / compiled_s:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# benchmarks/fake_services.py
+# Local stand-ins for the three services update.py talks to, fed from data/weekly:
+#
+#   GET  /works                          OpenAlex works search, openalex_id batches, cursors,
+#                                        source and author id filters
+#   GET  /sources, /authors              name search for scripts/resolve_whitelist.py
+#   GET  /_counters                      request counters, for benchmarks
+#   POST /v1/chat/completions            DeepSeek-compatible chat completions (single + batch)
+#   POST /repos/<owner>/<repo>/issues    GitHub issues (and /issues/<n>/comments)
+#
+# Latency, the share of 429/503 replies and the abstract size are configurable.
+# Run standalone and point update.py at it:
+#
+#   python benchmarks/fake_services.py --works 300 --latency 0.05 --error-rate 0.02
+#   OPENALEX_BASE_URL=http://127.0.0.1:8765 DEEPSEEK_BASE_URL=http://127.0.0.1:8765/v1 \
+#   GITHUB_API_URL=http://127.0.0.1:8765 python update.py
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data" / "weekly"
+WHITELIST_PATH = ROOT / "config" / "openalex_whitelist.json"
+
+def to_inverted_index(text):
+    # The shape OpenAlex ships abstracts in: word -> list of positions.
+    index = {}
+    for position, word in enumerate(text.split()):
+        index.setdefault(word, []).append(position)
+    return index
+
+def load_fixture_records():
+    records = []
+    for path in sorted(DATA_DIR.glob("????-??-??.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")):
+            if isinstance(item, dict) and item.get("title"):
+                records.append(item)
+    return records
+
+def load_whitelist():
+    try:
+        config = json.loads(WHITELIST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return [], []
+    return (
+        [(s["id"], s["name"]) for s in config.get("sources") or [] if s.get("id")],
+        [(a["id"], a["name"]) for a in config.get("authors") or [] if a.get("id")],
+    )
+
+def build_corpus(n, payload_scale=1.0, seed=0):
+    # n OpenAlex-shaped works cycled from the fixtures, each with its own id and DOI.
+    # Fixtures without an abstract get one sampled from the fixture vocabulary so the
+    # relevance filter sees realistic text; payload_scale stretches every abstract.
+    # Every 10th work sits in a whitelisted source and every 25th has a whitelisted author.
+    rng = random.Random(seed)
+    records = load_fixture_records()
+    whitelist_sources, whitelist_authors = load_whitelist()
+    vocabulary = " ".join(r.get("abstract") or r["title"] for r in records).split()
+
+    works = []
+    for i in range(n):
+        record = records[i % len(records)]
+        abstract = record.get("abstract") or " ".join(rng.choice(vocabulary) for _ in range(180))
+        words = abstract.split()
+        target = max(1, int(len(words) * payload_scale))
+        words = (words * (target // len(words) + 1))[:target]
+        source_type = "journal" if rng.random() < 0.8 else "repository"
+        source_id = f"https://openalex.org/S{100 + i % 50}"
+        source_name = record.get("journal") or "Bench Journal"
+        if whitelist_sources and i % 10 == 0:
+            source_id, source_name = whitelist_sources[(i // 10) % len(whitelist_sources)]
+            source_type = "journal"
+        authorships = [
+            {"author": {"id": f"https://openalex.org/A{1000 + i % 97}", "display_name": name}}
+            for name in (record.get("authors") or ["Ada Bench"])
+        ]
+        if whitelist_authors and i % 25 == 0:
+            author_id, author_name = whitelist_authors[(i // 25) % len(whitelist_authors)]
+            authorships.append({"author": {"id": author_id, "display_name": author_name}})
+        works.append({
+            "id": f"https://openalex.org/W{9000000000 + i}",
+            "doi": f"https://doi.org/10.5555/bench.{i}",
+            "title": record["title"],
+            "display_name": record["title"],
+            "created_date": f"2026-07-{1 + i % 28:02d}",
+            "publication_date": record.get("publication_date") or "2026-07-01",
+            "primary_location": {
+                "source": {
+                    "id": source_id,
+                    "display_name": source_name,
+                    "type": source_type,
+                },
+            },
+            "authorships": authorships,
+            "topics": [{"display_name": keyword} for keyword in (record.get("keywords") or [])],
+            "abstract_inverted_index": to_inverted_index(" ".join(words)),
+        })
+    return works
+
+def short_id(openalex_id):
+    return openalex_id.rsplit("/", 1)[-1]
+
+class FakeServices:
+    def __init__(self, works=300, latency=0.0, error_rate=0.0, payload_scale=1.0, seed=0,
+                 keywords=None, host="127.0.0.1", port=0):
+        self.corpus = build_corpus(works, payload_scale, seed)
+        self.by_id = {work["id"].rsplit("/", 1)[-1]: work for work in self.corpus}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {"openalex": 0, "llm": 0, "github": 0, "errors": 0, "bytes_out": 0}
+        # Each search keyword owns a disjoint slice of the corpus. With the keyword list
+        # known up front the slices are stable; otherwise keywords are hashed into 31 slots.
+        self.keywords = list(keywords or [])
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        return {
+            "OPENALEX_BASE_URL": self.base_url,
+            "DEEPSEEK_BASE_URL": f"{self.base_url}/v1",
+            "GITHUB_API_URL": self.base_url,
+            "GITHUB_REPOSITORY": "bench/bench",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def snapshot_counters(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def count(self, name, nbytes=0):
+        with self.lock:
+            self.counters[name] += 1
+            self.counters["bytes_out"] += nbytes
+
+    def injected_error(self):
+        with self.lock:
+            if self.rng.random() >= self.error_rate:
+                return None
+            self.counters["errors"] += 1
+            return self.rng.choice([429, 503])
+
+    def keyword_slice(self, keyword):
+        if keyword in self.keywords:
+            return self.corpus[self.keywords.index(keyword)::len(self.keywords)]
+        return self.corpus[zlib.crc32(keyword.encode("utf-8")) % 31::31]
+
+    # ---- OpenAlex ----
+    def works(self, query):
+        select = [f for f in (query.get("select") or [""])[0].split(",") if f]
+        filters = (query.get("filter") or [""])[0]
+        per_page = int((query.get("per-page") or ["25"])[0])
+        cursor = (query.get("cursor") or [None])[0]
+
+        match = re.search(r"openalex_id:([^,]+)", filters)
+        sources = re.search(r"primary_location\.source\.id:([^,]+)", filters)
+        authors = re.search(r"authorships\.author\.id:([^,]+)", filters)
+        if match:
+            results = [self.by_id[i] for i in match.group(1).split("|") if i in self.by_id]
+            next_cursor = None
+        else:
+            if sources:
+                wanted = set(sources.group(1).split("|"))
+                pool = [w for w in self.corpus if short_id(w["primary_location"]["source"]["id"]) in wanted]
+            elif authors:
+                wanted = set(authors.group(1).split("|"))
+                pool = [
+                    w for w in self.corpus
+                    if any(short_id(a["author"]["id"]) in wanted for a in w["authorships"])
+                ]
+            else:
+                pool = self.keyword_slice((query.get("search") or [""])[0])
+            start = 0 if cursor in (None, "*") else int(cursor)
+            results = pool[start:start + per_page]
+            next_cursor = str(start + per_page) if cursor and start + per_page < len(pool) else None
+
+        if select:
+            results = [{k: v for k, v in work.items() if k in select} for work in results]
+        return {"meta": {"count": len(results), "next_cursor": next_cursor}, "results": results}
+
+    def entities(self, kind, query):
+        # One exact match plus a busier near-miss, so ranking has something to decide.
+        name = (query.get("search") or [""])[0]
+        prefix = "S" if kind == "sources" else "A"
+        seed = zlib.crc32(name.encode("utf-8"))
+        results = [
+            {"id": f"https://openalex.org/{prefix}{seed}", "display_name": name, "works_count": 40 + seed % 500},
+            {"id": f"https://openalex.org/{prefix}{seed + 1}", "display_name": f"{name} Review Letters", "works_count": 90000},
+        ]
+        return {"meta": {"count": len(results)}, "results": results}
+
+    # ---- DeepSeek ----
+    def chat_completion(self, payload):
+        content = payload["messages"][-1]["content"]
+        n_articles = content.count("=== ARTICLE ")
+
+        def scores(seed_text, index=None):
+            rnd = random.Random(seed_text)
+            obj = {
+                "research_quality_score": rnd.randint(40, 90),
+                "research_reasoning": "Synthetic reasoning from the local benchmark server.",
+                "potential_impact_score": rnd.randint(30, 90),
+                "impact_reasoning": "Synthetic reasoning from the local benchmark server.",
+                "topic_tags": rnd.sample(["attention", "self_control", "value_based_choice", "deception_dishonesty"], 2),
+                "method_tags": [],
+            }
+            if index is not None:
+                obj["index"] = index
+            return obj
+
+        if n_articles:
+            parts = content.split("=== ARTICLE ")[1:]
+            reply = {"results": [scores(part, i) for i, part in enumerate(parts)]}
+        else:
+            reply = scores(content)
+
+        prompt_tokens = len(content) // 4
+        completion_text = json.dumps(reply)
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "bench"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion_text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(completion_text) // 4,
+                "total_tokens": prompt_tokens + len(completion_text) // 4,
+            },
+        }
+
+    def _handler_class(services):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, obj, counter):
+                body = json.dumps(obj).encode("utf-8")
+                services.count(counter, len(body))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def delay_or_error(self, counter):
+                if services.latency:
+                    time.sleep(services.latency)
+                status = services.injected_error()
+                if status:
+                    self.reply(status, {"error": "injected"}, counter)
+                    return True
+                return False
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/_counters":
+                    body = json.dumps(services.snapshot_counters()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if url.path not in ("/works", "/sources", "/authors"):
+                    return self.reply(404, {"error": "not found"}, "openalex")
+                if self.delay_or_error("openalex"):
+                    return
+                if url.path == "/works":
+                    return self.reply(200, services.works(parse_qs(url.query)), "openalex")
+                self.reply(200, services.entities(url.path[1:], parse_qs(url.query)), "openalex")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                if url.path.endswith("/chat/completions"):
+                    if self.delay_or_error("llm"):
+                        return
+                    return self.reply(200, services.chat_completion(payload), "llm")
+
+                if re.fullmatch(r"/repos/[^/]+/[^/]+/issues(/\d+/comments)?", url.path):
+                    if self.delay_or_error("github"):
+                        return
+                    return self.reply(201, {"number": 1, "html_url": f"{services.base_url}/issues/1"}, "github")
+
+                self.reply(404, {"error": "not found"}, "github")
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAlex / DeepSeek / GitHub stand-ins.")
+    parser.add_argument("--works", type=int, default=300, help="corpus size")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 429/503")
+    parser.add_argument("--payload-scale", type=float, default=1.0, help="abstract length multiplier")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    services = FakeServices(args.works, args.latency, args.error_rate, args.payload_scale, port=args.port).start()
+    for key, value in services.env().items():
+        print(f"{key}={value}")
+    try:
+        services.thread.join()
+    except KeyboardInterrupt:
+        services.stop()
+
+if __name__ == "__main__":
+    main()
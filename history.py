@@ -0,0 +1,347 @@
+# history.py
+# Consolidated, indexed store of every weekly snapshot, so consumers such as the monthly
+# audit query one SQLite file instead of re-parsing data/weekly/*.json. A manifest of
+# ingested snapshots (sha256, size, mtime) lets sync() fold in only new or changed files;
+# the store can always be rebuilt from the snapshots.
+#
+# Each snapshot also gets partial aggregates (count, sum and sum of squares of both scores
+# per journal, topic, ISO week and week x topic). Re-ingesting a snapshot replaces exactly
+# its own rows, so summing them over all snapshots always gives the current totals.
+#
+# Every article also gets a MinHash signature and its LSH bucket keys (neardup.py), so a
+# new candidate can be checked against everything scored before with one indexed lookup.
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aggregation import TOTAL_FIELDS, aggregate
+from neardup import BANDS, SIMILARITY_THRESHOLD, band_keys, pack_signature, signature, similarity, unpack_signature
+
+HISTORY_DB_PATH = Path("data/history.sqlite")
+SCHEMA_VERSION = 3
+AGGREGATE_DIMENSIONS = ("global", "journal", "topic", "week", "week_topic")
+
+SCHEMA = """
+CREATE TABLE snapshots (
+    run_date TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    articles INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY,
+    run_date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    journal TEXT NOT NULL,
+    doi TEXT NOT NULL,
+    openalex_id TEXT,
+    publication_date TEXT,
+    research_score REAL,
+    impact_score REAL,
+    topic_tags TEXT NOT NULL,
+    method_tags TEXT NOT NULL
+);
+CREATE TABLE article_topics (
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    run_date TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE TABLE aggregates (
+    run_date TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    subkey TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    rs_n INTEGER NOT NULL,
+    rs_sum REAL NOT NULL,
+    rs_sumsq REAL NOT NULL,
+    is_n INTEGER NOT NULL,
+    is_sum REAL NOT NULL,
+    is_sumsq REAL NOT NULL,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (run_date, dimension, key, subkey)
+);
+CREATE TABLE article_minhash (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    signature BLOB NOT NULL
+);
+CREATE TABLE article_lsh (
+    bucket INTEGER NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE
+);
+CREATE INDEX articles_run_date ON articles(run_date, position);
+CREATE INDEX articles_journal ON articles(journal);
+CREATE INDEX articles_doi ON articles(doi);
+CREATE INDEX article_topics_tag ON article_topics(tag, run_date);
+CREATE INDEX article_lsh_bucket ON article_lsh(bucket);
+CREATE INDEX article_lsh_article ON article_lsh(article_id);
+"""
+
+SNAPSHOT_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})\.json$")
+
+def score_value(x):
+    # "N/A", blanks and anything non-numeric are stored as NULL.
+    try:
+        if x is None:
+            return None
+        if isinstance(x, (int, float)):
+            return float(x)
+        x = str(x).strip()
+        if x.upper() == "N/A" or x == "":
+            return None
+        return float(x)
+    except Exception:
+        return None
+
+def tag_list(value):
+    return [str(tag) for tag in value] if isinstance(value, list) else []
+
+def snapshot_aggregates(run_date, rows):
+    # rows are (journal, research_score, impact_score, topic_tags) in snapshot order.
+    # first_seen orders groups by first appearance, which the audit uses to break ties.
+    journals = [row[0] for row in rows]
+    groups = aggregate(
+        [run_date] * len(rows),
+        journals,
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        [row[3] for row in rows],
+    )
+    return [
+        (run_date, dimension, group["key"], group["subkey"], *(group[field] for field in TOTAL_FIELDS),
+         f"{run_date}:{group['first']:06d}")
+        for dimension in AGGREGATE_DIMENSIONS
+        for group in groups[dimension]
+    ]
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = Path(path)
+        self.ready = False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self.lock:
+            if not self.ready:
+                self.ensure_schema(conn)
+                self.ready = True
+        return conn
+
+    def ensure_schema(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        # Everything here is derived from the snapshots, so an old layout is dropped and
+        # the next sync() rebuilds it.
+        with conn:
+            for table in ("article_lsh", "article_minhash", "aggregates", "article_topics", "articles", "snapshots"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def ingest(self, conn, run_date, items, sha256, size, mtime_ns):
+        conn.execute("DELETE FROM articles WHERE run_date = ?", (run_date,))
+        conn.execute("DELETE FROM aggregates WHERE run_date = ?", (run_date,))
+        scored = []
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            title = str(item.get("title") or "").strip()
+            journal = str(item.get("journal") or "").strip()
+            research_score = score_value(item.get("research_score"))
+            impact_score = score_value(item.get("impact_score"))
+            topic_tags = tag_list(item.get("topic_tags"))
+            cursor = conn.execute(
+                "INSERT INTO articles (run_date, position, title, journal, doi, openalex_id, publication_date,"
+                " research_score, impact_score, topic_tags, method_tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_date,
+                    position,
+                    title,
+                    journal,
+                    str(item.get("doi") or "").strip(),
+                    item.get("openalex_id"),
+                    item.get("publication_date"),
+                    research_score,
+                    impact_score,
+                    json.dumps(topic_tags, ensure_ascii=False),
+                    json.dumps(tag_list(item.get("method_tags")), ensure_ascii=False),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO article_topics (article_id, run_date, tag) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, run_date, tag) for tag in topic_tags],
+            )
+            sig = signature(title, str(item.get("abstract") or ""))
+            if sig is not None:
+                conn.execute(
+                    "INSERT INTO article_minhash (article_id, signature) VALUES (?, ?)",
+                    (cursor.lastrowid, pack_signature(sig)),
+                )
+                conn.executemany(
+                    "INSERT INTO article_lsh (bucket, article_id) VALUES (?, ?)",
+                    [(bucket, cursor.lastrowid) for bucket in band_keys(sig)],
+                )
+            scored.append((journal, research_score, impact_score, topic_tags))
+        conn.executemany(
+            "INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            snapshot_aggregates(run_date, scored),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshots (run_date, sha256, size, mtime_ns, articles, ingested_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (run_date, sha256, size, mtime_ns, len(scored), datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        )
+        return len(scored)
+
+    def record_snapshot(self, path, items=None):
+        # Called right after a snapshot is written; items saves parsing it back.
+        path = Path(path)
+        match = SNAPSHOT_NAME.match(path.name)
+        if not match:
+            raise ValueError(f"not a snapshot file name: {path.name}")
+        raw = path.read_bytes()
+        if items is None:
+            items = json.loads(raw)
+        stat = path.stat()
+        conn = self.connect()
+        try:
+            with conn:
+                return self.ingest(conn, match.group(1), items, hashlib.sha256(raw).hexdigest(), stat.st_size, stat.st_mtime_ns)
+        finally:
+            conn.close()
+
+    def sync(self, data_dir):
+        # Fold in snapshots that are new or changed since they were last ingested and drop
+        # ones whose file is gone. Unchanged size and mtime skip the file without reading
+        # it; after a fresh checkout the sha256 decides instead, and no JSON is parsed.
+        summary = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        conn = self.connect()
+        try:
+            manifest = {
+                run_date: (sha256, size, mtime_ns)
+                for run_date, sha256, size, mtime_ns in conn.execute(
+                    "SELECT run_date, sha256, size, mtime_ns FROM snapshots"
+                )
+            }
+            seen = set()
+            for path in sorted(Path(data_dir).glob("????-??-??.json")):
+                match = SNAPSHOT_NAME.match(path.name)
+                if not match:
+                    continue
+                run_date = match.group(1)
+                seen.add(run_date)
+                stat = path.stat()
+                known = manifest.get(run_date)
+                if known and known[1:] == (stat.st_size, stat.st_mtime_ns):
+                    summary["unchanged"] += 1
+                    continue
+
+                raw = path.read_bytes()
+                sha256 = hashlib.sha256(raw).hexdigest()
+                if known and known[0] == sha256:
+                    with conn:
+                        conn.execute(
+                            "UPDATE snapshots SET size = ?, mtime_ns = ? WHERE run_date = ?",
+                            (stat.st_size, stat.st_mtime_ns, run_date),
+                        )
+                    summary["unchanged"] += 1
+                    continue
+
+                try:
+                    items = json.loads(raw)
+                    if not isinstance(items, list):
+                        raise ValueError("expected a JSON list of articles")
+                except ValueError as exc:
+                    print(f"Warning: skipping unreadable snapshot {path}: {exc}")
+                    summary["failed"] += 1
+                    continue
+                with conn:
+                    self.ingest(conn, run_date, items, sha256, stat.st_size, stat.st_mtime_ns)
+                summary["updated" if known else "added"] += 1
+
+            gone = sorted(set(manifest) - seen)
+            with conn:
+                for run_date in gone:
+                    conn.execute("DELETE FROM articles WHERE run_date = ?", (run_date,))
+                    conn.execute("DELETE FROM aggregates WHERE run_date = ?", (run_date,))
+                    conn.execute("DELETE FROM snapshots WHERE run_date = ?", (run_date,))
+            summary["removed"] = len(gone)
+        finally:
+            conn.close()
+        return summary
+
+    def run_dates(self):
+        conn = self.connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT run_date FROM snapshots ORDER BY run_date")]
+        finally:
+            conn.close()
+
+    def aggregates(self):
+        # Totals per dimension, summed over every ingested snapshot, each dimension's
+        # groups in order of first appearance.
+        query = (
+            "SELECT dimension, key, subkey, SUM(n), SUM(rs_n), SUM(rs_sum), SUM(rs_sumsq),"
+            " SUM(is_n), SUM(is_sum), SUM(is_sumsq), MIN(first_seen)"
+            " FROM aggregates GROUP BY dimension, key, subkey ORDER BY MIN(first_seen)"
+        )
+        groups = {dimension: [] for dimension in AGGREGATE_DIMENSIONS}
+        conn = self.connect()
+        try:
+            for dimension, key, subkey, n, rs_n, rs_sum, rs_sumsq, is_n, is_sum, is_sumsq, _ in conn.execute(query):
+                groups[dimension].append({
+                    "key": key,
+                    "subkey": subkey,
+                    "n": n,
+                    "rs_n": rs_n,
+                    "rs_sum": rs_sum,
+                    "rs_sumsq": rs_sumsq,
+                    "is_n": is_n,
+                    "is_sum": is_sum,
+                    "is_sumsq": is_sumsq,
+                })
+        finally:
+            conn.close()
+        return groups
+
+    def near_duplicates(self, signatures, exclude_run_date=None, threshold=SIMILARITY_THRESHOLD, exclude_dois=None, doi_key=None):
+        # For each signature (or None), the most similar stored article at or above the
+        # threshold as {"run_date", "doi", "title", "similarity"}, else None. Articles from
+        # exclude_run_date are ignored, so re-running a week does not match itself.
+        # exclude_dois, one per signature, ignores stored articles whose doi_key(doi) equals
+        # it: a repeat of the same DOI is the score cache's business, not a near-duplicate.
+        exclude_dois = exclude_dois or [None] * len(signatures)
+        doi_key = doi_key or (lambda doi: doi)
+        query = (
+            "SELECT DISTINCT m.article_id, m.signature, a.run_date, a.doi, a.title"
+            " FROM article_lsh l JOIN article_minhash m ON m.article_id = l.article_id"
+            " JOIN articles a ON a.id = l.article_id"
+            f" WHERE l.bucket IN ({', '.join('?' * BANDS)}) AND a.run_date != ?"
+        )
+        matches = []
+        conn = self.connect()
+        try:
+            for sig, exclude_doi in zip(signatures, exclude_dois):
+                best = None
+                if sig is not None:
+                    for _, blob, run_date, doi, title in conn.execute(query, (*band_keys(sig), exclude_run_date or "")):
+                        if exclude_doi and doi_key(doi) == exclude_doi:
+                            continue
+                        score = similarity(sig, unpack_signature(blob))
+                        if score >= threshold and (best is None or score > best["similarity"]):
+                            best = {"run_date": run_date, "doi": doi, "title": title, "similarity": score}
+                matches.append(best)
+        finally:
+            conn.close()
+        return matches
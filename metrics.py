@@ -0,0 +1,105 @@
+# metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class RunMetrics:
+    # Thread-safe counters for one run: wall-clock spans per stage, latency and status
+    # codes per request, retries, LLM token usage and cache hit rates.
+
+    def __init__(self, prompt_price_per_mtok=0.0, completion_price_per_mtok=0.0):
+        self.prompt_price_per_mtok = prompt_price_per_mtok
+        self.completion_price_per_mtok = completion_price_per_mtok
+        self.started = time.time()
+        self.spans = {}
+        self.requests = {}
+        self.counters = {}
+        self.tokens = {"prompt": 0, "completion": 0, "prompt_cache_hit": 0}
+        self.caches = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                span = self.spans.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+                span["count"] += 1
+                span["seconds"] += seconds
+                span["max_seconds"] = max(span["max_seconds"], seconds)
+
+    def record_request(self, service, seconds, status):
+        with self.lock:
+            stats = self.requests.setdefault(service, {"latencies": [], "statuses": {}})
+            stats["latencies"].append(seconds)
+            stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_usage(self, usage):
+        if usage is None:
+            return
+        with self.lock:
+            self.tokens["prompt"] += getattr(usage, "prompt_tokens", 0) or 0
+            self.tokens["completion"] += getattr(usage, "completion_tokens", 0) or 0
+            # DeepSeek reports how much of the prompt was served from its context cache.
+            self.tokens["prompt_cache_hit"] += getattr(usage, "prompt_cache_hit_tokens", 0) or 0
+
+    def record_cache(self, name, hit):
+        with self.lock:
+            cache = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+            cache["hits" if hit else "misses"] += 1
+
+    def set_cache(self, name, hits, misses):
+        with self.lock:
+            self.caches[name] = {"hits": hits, "misses": misses}
+
+    def as_dict(self):
+        with self.lock:
+            requests_out = {}
+            for service, stats in self.requests.items():
+                latencies = stats["latencies"]
+                requests_out[service] = {
+                    "count": len(latencies),
+                    "seconds": round(sum(latencies), 3),
+                    "p50_seconds": round(percentile(latencies, 0.5), 3),
+                    "p95_seconds": round(percentile(latencies, 0.95), 3),
+                    "max_seconds": round(max(latencies), 3),
+                    "statuses": dict(sorted(stats["statuses"].items())),
+                }
+            caches_out = {}
+            for name, cache in self.caches.items():
+                lookups = cache["hits"] + cache["misses"]
+                caches_out[name] = dict(cache, hit_rate=round(cache["hits"] / lookups, 3) if lookups else None)
+            cost = (
+                self.tokens["prompt"] * self.prompt_price_per_mtok
+                + self.tokens["completion"] * self.completion_price_per_mtok
+            ) / 1_000_000
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+                "wall_seconds": round(time.time() - self.started, 3),
+                "stages": {
+                    name: {
+                        "count": span["count"],
+                        "seconds": round(span["seconds"], 3),
+                        "max_seconds": round(span["max_seconds"], 3),
+                    }
+                    for name, span in self.spans.items()
+                },
+                "requests": requests_out,
+                "counters": dict(sorted(self.counters.items())),
+                "tokens": dict(self.tokens),
+                "estimated_cost_usd": round(cost, 4),
+                "caches": caches_out,
+            }
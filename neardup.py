@@ -0,0 +1,110 @@
+# neardup.py
+# MinHash signatures and LSH banding for near-duplicate articles: preprint and published
+# versions, corrected records and chapter twins that carry different DOIs but (nearly) the
+# same title and abstract. A signature is NUM_PERM minimums of salted hashes over the word
+# shingles of the normalised text; the share of equal positions estimates the Jaccard
+# similarity of the shingle sets. Signatures are cut into BANDS bands of ROWS values and
+# each band is hashed to a bucket key, so only articles sharing a bucket are compared.
+# With 16 bands of 4 rows, pairs at Jaccard 0.7 share a bucket ~99% of the time and pairs
+# at 0.3 about 12% of the time; SIMILARITY_THRESHOLD then decides on the estimate.
+import random
+import re
+import zlib
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.7
+PRIME = 4294967291  # largest prime below 2**32, so a * x stays within 64 bits
+
+# Fixed seed: signatures are persisted, so the hash family must not change between runs.
+_rng = random.Random(1729)
+COEFFS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+_numpy_coeffs = None
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def normalized_words(title, abstract=""):
+    text = TAG_PATTERN.sub(" ", f"{title or ''} {abstract or ''}").lower()
+    return WORD_PATTERN.findall(text)
+
+def shingle_hashes(title, abstract=""):
+    words = normalized_words(title, abstract)
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return sorted(zlib.crc32(shingle.encode("utf-8")) for shingle in shingles)
+
+def numpy_coeffs():
+    # (np, a, b) with the coefficients as column vectors, or None without numpy. Loaded on
+    # the first signature rather than at import; numpy is optional and the pure-Python
+    # path gives the same signatures.
+    global _numpy_coeffs
+    if _numpy_coeffs is None:
+        try:
+            import numpy as np
+        except ImportError:
+            _numpy_coeffs = False
+        else:
+            _numpy_coeffs = (
+                np,
+                np.array([a for a, _ in COEFFS], dtype=np.uint64)[:, None],
+                np.array([b for _, b in COEFFS], dtype=np.uint64)[:, None],
+            )
+    return _numpy_coeffs or None
+
+def signature(title, abstract=""):
+    # Tuple of NUM_PERM ints, or None when there is no text to go on.
+    hashes = shingle_hashes(title, abstract)
+    if not hashes:
+        return None
+    coeffs = numpy_coeffs()
+    if coeffs is not None:
+        np, coeff_a, coeff_b = coeffs
+        x = np.asarray(hashes, dtype=np.uint64)[None, :]
+        return tuple(((coeff_a * x + coeff_b) % PRIME).min(axis=1).tolist())
+    return tuple(min((a * x + b) % PRIME for x in hashes) for a, b in COEFFS)
+
+def band_keys(sig):
+    # One 64-bit key per band: the band number in the high bits, a crc32 of its rows below.
+    keys = []
+    for band in range(BANDS):
+        rows = array("I", sig[band * ROWS:(band + 1) * ROWS]).tobytes()
+        keys.append((band << 32) | zlib.crc32(rows))
+    return keys
+
+def similarity(sig_a, sig_b):
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+def pack_signature(sig):
+    return array("I", sig).tobytes()
+
+def unpack_signature(blob):
+    return tuple(array("I", blob))
+
+class NearDuplicateIndex:
+    # In-memory LSH index, for near-duplicates among the candidates of one run.
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = {}
+
+    def add(self, key, sig):
+        self.signatures[key] = sig
+        for bucket in band_keys(sig):
+            self.buckets.setdefault(bucket, []).append(key)
+
+    def query(self, sig):
+        # (key, similarity) of the most similar indexed entry at or above the threshold.
+        best = None
+        candidates = dict.fromkeys(key for bucket in band_keys(sig) for key in self.buckets.get(bucket, ()))
+        for key in candidates:
+            score = similarity(sig, self.signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
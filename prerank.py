@@ -0,0 +1,105 @@
+# prerank.py
+# Cheap local estimate of the LLM's research and impact scores, used to decide which
+# candidates are worth an LLM call. Title + abstract become hashed bag-of-words vectors
+# (unigrams and bigrams, tf-idf weighted, L2-normalised) and a ridge regression fitted on
+# past snapshots predicts both scores at once.
+#
+# The ridge is solved in its kernel (dual) form: the training set is a few hundred to a few
+# thousand articles against thousands of hashed features, so the n x n system is the small
+# one. The same solve gives each candidate's novelty, 1 - k' (K + alpha I)^-1 k: close to 0
+# for text well covered by scored articles, close to 1 for text unlike any of them, whose
+# prediction is not worth trusting.
+import math
+import re
+import zlib
+from importlib.util import find_spec
+
+# numpy is optional (without it the caller falls back to no pre-ranking) and is imported
+# by the functions that use it, so importing this module stays cheap.
+HAS_NUMPY = find_spec("numpy") is not None
+
+HASH_DIM = 2 ** 12
+RIDGE_ALPHA = 0.5
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+
+def text_features(text):
+    words = TOKEN_PATTERN.findall((text or "").lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def hashed_counts(texts, dim=HASH_DIM):
+    # Signed feature hashing with crc32, which (unlike hash()) is stable across runs.
+    # Returns a dense n x dim matrix of summed +-1 counts.
+    import numpy as np
+
+    rows, cols, signs = [], [], []
+    for row, text in enumerate(texts):
+        for feature in text_features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            rows.append(row)
+            cols.append(h % dim)
+            signs.append(1.0 if h & 0x80000000 else -1.0)
+    counts = np.zeros((len(texts), dim))
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), signs)
+    return counts
+
+def tfidf(counts, idf):
+    import numpy as np
+
+    x = np.sign(counts) * np.log1p(np.abs(counts)) * idf
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norms > 0, norms, 1.0)
+
+class PreRanker:
+    def __init__(self, alpha=RIDGE_ALPHA, dim=HASH_DIM):
+        if not HAS_NUMPY:
+            raise RuntimeError("prerank needs numpy")
+        self.alpha = alpha
+        self.dim = dim
+        self.idf = None
+        self.train = None
+        self.dual = None
+        self.inverse = None
+        self.mean = None
+
+    def fit(self, texts, targets):
+        # targets: one row per text, one column per score.
+        import numpy as np
+
+        counts = hashed_counts(texts, self.dim)
+        df = np.count_nonzero(counts, axis=0)
+        self.idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+        self.train = tfidf(counts, self.idf)
+        y = np.asarray(targets, dtype=float)
+        self.mean = y.mean(axis=0)
+        kernel = self.train @ self.train.T
+        self.inverse = np.linalg.inv(kernel + self.alpha * np.eye(len(texts)))
+        self.dual = self.inverse @ (y - self.mean)
+        return self
+
+    def predict(self, texts):
+        # Returns (predictions, novelty): predictions has one row per text and one column
+        # per fitted score; novelty is in [0, 1].
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, len(self.mean))), np.zeros(0)
+        x = tfidf(hashed_counts(texts, self.dim), self.idf)
+        k = x @ self.train.T
+        predictions = self.mean + k @ self.dual
+        covered = np.einsum("ij,jk,ik->i", k, self.inverse, k)
+        novelty = np.clip(np.einsum("ij,ij->i", x, x) - covered, 0.0, 1.0)
+        return predictions, novelty
+
+def select_for_scoring(priorities, novelty, budget, max_uncertain, novelty_threshold):
+    # (top, uncertain) indexes, at most budget in all: the budget - max_uncertain highest
+    # priorities, then up to max_uncertain of the rest whose novelty is at least
+    # novelty_threshold, most novel first. Slots no uncertain candidate takes go to the
+    # next highest priorities. Ties keep input order.
+    order = sorted(range(len(priorities)), key=lambda i: -priorities[i])
+    head = max(0, budget - max_uncertain)
+    rest = [i for i in order[head:] if novelty[i] >= novelty_threshold and not math.isnan(novelty[i])]
+    rest.sort(key=lambda i: -novelty[i])
+    uncertain = rest[:budget - head]
+    chosen = set(uncertain)
+    top = order[:head] + [i for i in order[head:] if i not in chosen][:budget - head - len(uncertain)]
+    return top, uncertain
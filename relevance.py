@@ -0,0 +1,265 @@
+# relevance.py
+import re
+from functools import lru_cache
+
+RELEVANCE_RULES = {
+    "dishonesty": {
+        "core": [
+            "dishonesty",
+            "cheating",
+            "deception",
+            "honesty",
+            "honest behavior",
+            "moral identity",
+            "self concept maintenance",
+            "reputation management",
+        ],
+        "domain": [
+            "decision making",
+            "choice",
+            "behavior",
+            "behaviour",
+            "experiment",
+            "participant",
+            "psychology",
+            "relationship",
+            "consumer",
+            "economic game",
+            "social norm",
+        ],
+        "exclude": [
+            "legal profession",
+            "legal studies",
+            "religious education",
+            "islamic",
+            "maqasid",
+            "marriage",
+            "wives rights",
+            "anti corruption",
+            "professional misconduct",
+        ],
+    },
+    "decision_process": {
+        "core": [
+            "drift diffusion",
+            "hddm",
+            "evidence accumulation",
+            "sequential sampling",
+            "reinforcement learning",
+            "computational psychiatry",
+            "computational modeling",
+            "computational modelling",
+        ],
+        "domain": [
+            "choice",
+            "behavior",
+            "behaviour",
+            "cognitive",
+            "psychology",
+            "psychiatry",
+            "neural",
+            "brain",
+            "reward",
+            "participant",
+            "human",
+        ],
+        "exclude": [
+            "lyapunov",
+            "barrier function",
+            "barrier functions",
+            "robotics",
+            "autonomous vehicle",
+            "control systems",
+        ],
+    },
+    "cognitive_control": {
+        "core": [
+            "cognitive control",
+            "executive control",
+            "self control",
+            "response inhibition",
+            "conflict monitoring",
+            "expected value of control",
+        ],
+        "domain": [
+            "decision",
+            "choice",
+            "behavior",
+            "behaviour",
+            "attention",
+            "task",
+            "inhibition",
+            "conflict",
+            "neural",
+            "brain",
+            "participant",
+            "human",
+        ],
+    },
+    "consumer_decision": {
+        "core": [
+            "consumer decision",
+            "consumer behavior",
+            "consumer behaviour",
+            "value based decision",
+            "value based choice",
+            "intertemporal choice",
+            "delay discounting",
+            "loss aversion",
+            "risk preference",
+        ],
+        "domain": [
+            "consumer",
+            "purchase",
+            "choice",
+            "decision",
+            "preference",
+            "behavior",
+            "behaviour",
+            "reward",
+            "participant",
+            "human",
+        ],
+    },
+    "additional_decision_topics": {
+        "core": [
+            "decision conflict",
+            "choice architecture",
+            "moral behavior",
+            "moral behaviour",
+            "honest behavior",
+        ],
+        "domain": [
+            "decision",
+            "choice",
+            "behavior",
+            "behaviour",
+            "experiment",
+            "psychology",
+            "social",
+            "moral",
+            "participant",
+            "human",
+        ],
+    },
+}
+
+STRONG_TITLE_TERMS = {
+    "dishonesty": [
+        "dishonesty",
+        "cheating",
+        "deception",
+        "prosocial lying",
+    ],
+    "decision_process": [
+        "drift diffusion",
+        "hddm",
+        "evidence accumulation",
+        "sequential sampling",
+        "computational psychiatry",
+    ],
+    "cognitive_control": [
+        "cognitive control",
+        "executive control",
+        "response inhibition",
+        "conflict monitoring",
+        "expected value of control",
+    ],
+    "consumer_decision": [
+        "consumer decision",
+        "consumer behavior",
+        "intertemporal choice",
+        "delay discounting",
+        "loss aversion",
+        "risk preference",
+    ],
+    "additional_decision_topics": [
+        "decision conflict",
+        "choice architecture",
+        "moral behavior",
+        "honest behavior",
+    ],
+}
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+# Separators, punctuation and whitespace runs all collapse to one space.
+_NON_ALNUM_RUN_RE = re.compile(r"[^a-z0-9]+")
+
+MIN_ABSTRACT_WORDS = 30
+
+def strip_html(x: str) -> str:
+    return _HTML_TAG_RE.sub(" ", x or "").strip()
+
+# The same work usually comes back from several keyword searches, so its title and
+# abstract get normalized once and reused across rule checks.
+@lru_cache(maxsize=4096)
+def normalize_for_match(x: str) -> str:
+    x = strip_html(x).lower()
+    return _NON_ALNUM_RUN_RE.sub(" ", x).strip()
+
+class TermMatcher:
+    # Terms are normalized once, when the matcher is built. Matching is then a plain
+    # substring test against already-normalized text, the same semantics the old
+    # per-call matched_terms had ("behavior" also matches "behavioral").
+
+    def __init__(self, terms):
+        self.terms = [(term, normalize_for_match(term)) for term in terms]
+
+    def match(self, text):
+        return [term for term, normalized in self.terms if normalized in text]
+
+    def search(self, text):
+        return any(normalized in text for _, normalized in self.terms)
+
+class CompiledRule:
+    def __init__(self, rule, strong_title_terms):
+        self.core = TermMatcher(rule["core"])
+        self.domain = TermMatcher(rule["domain"])
+        self.exclude = TermMatcher(rule.get("exclude", []))
+        self.strong_title = TermMatcher(strong_title_terms)
+
+def compile_relevance_rules(rules, strong_title_terms):
+    return {
+        name: CompiledRule(rule, strong_title_terms.get(name, []))
+        for name, rule in rules.items()
+    }
+
+COMPILED_RULES = compile_relevance_rules(RELEVANCE_RULES, STRONG_TITLE_TERMS)
+
+def has_enough_text_for_filter(rule, title_text: str, abstract_text: str):
+    if len(abstract_text.split()) >= MIN_ABSTRACT_WORDS:
+        return True
+    return rule.strong_title.search(title_text)
+
+def relevance_matches(query_name: str, title: str, abstract: str, compiled_rules=None):
+    rule = (COMPILED_RULES if compiled_rules is None else compiled_rules).get(query_name)
+    if not rule:
+        return []
+
+    # Title and abstract are normalized once and reused by every check below.
+    title_text = normalize_for_match(title)
+    abstract_text = normalize_for_match(abstract)
+    if not has_enough_text_for_filter(rule, title_text, abstract_text):
+        return []
+
+    text = " ".join(part for part in (title_text, abstract_text) if part)
+    if rule.exclude.search(text):
+        return []
+
+    core_matches = rule.core.match(text)
+    if not core_matches:
+        return []
+
+    domain_matches = rule.domain.match(text)
+    if domain_matches:
+        return sorted(set(core_matches + domain_matches))
+
+    return []
+
+def any_relevance_matches(title: str, abstract: str, compiled_rules=None):
+    # Terms matched under any rule, for works that did not come from a topic search.
+    rules = COMPILED_RULES if compiled_rules is None else compiled_rules
+    matches = set()
+    for query_name in rules:
+        matches.update(relevance_matches(query_name, title, abstract, rules))
+    return sorted(matches)
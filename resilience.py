@@ -0,0 +1,139 @@
+# resilience.py
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpenError(requests.ConnectionError):
+    # Subclasses ConnectionError so callers that already handle a dead endpoint
+    # handle a short-circuited call the same way.
+    pass
+
+def parse_retry_after(value):
+    # Retry-After is either delta-seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def outcome_response(outcome):
+    # A requests.Response, or the response attached to a requests/openai exception.
+    if hasattr(outcome, "status_code") and hasattr(outcome, "headers"):
+        return outcome
+    return getattr(outcome, "response", None)
+
+def outcome_status(outcome):
+    response = outcome_response(outcome)
+    if response is not None:
+        return response.status_code
+    return getattr(outcome, "status_code", None)
+
+def is_transient(outcome):
+    status = outcome_status(outcome)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(outcome, (requests.ConnectionError, requests.Timeout))
+
+def is_endpoint_failure(outcome):
+    # What counts against the circuit breaker: no answer at all, or a 5xx. A 429 means
+    # the endpoint is alive and merely throttling us.
+    status = outcome_status(outcome)
+    return status is None or status >= 500
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        # Full jitter, so workers that failed together do not retry together.
+        # A Retry-After from the server is a floor; max_delay caps both.
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        return min(self.max_delay, backoff)
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive endpoint failures and rejects calls for
+    # reset_after seconds. Then it is half-open: the first call goes through as the only
+    # probe while every other call keeps failing fast. Success closes the circuit; a
+    # failure opens it again straight away.
+
+    def __init__(self, name, failure_threshold=5, reset_after=60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < self.reset_after:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open; not calling it")
+            self.probing = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.failures >= self.failure_threshold and self.opened_at is None):
+                self.probing = False
+                self.opened_at = time.monotonic()
+                print(
+                    f"{self.name}: {self.failures} consecutive failures; "
+                    f"failing fast for the next {self.reset_after:.0f}s."
+                )
+
+def call_with_retries(send, policy, breaker, retryable=is_transient, on_retry=None):
+    # send() makes one attempt and returns a result or raises. retryable(outcome) says
+    # whether that result or exception is worth another attempt. Once attempts run out
+    # the last outcome is returned or re-raised, so callers see the same response or
+    # exception they would have seen without retries.
+    for attempt in range(policy.max_attempts):
+        breaker.before_call()
+        try:
+            outcome = send()
+        except Exception as exc:
+            outcome = exc
+
+        transient = retryable(outcome)
+        if transient and is_endpoint_failure(outcome):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if not transient or attempt == policy.max_attempts - 1:
+            break
+
+        response = outcome_response(outcome)
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        delay = policy.delay(attempt, retry_after)
+        if on_retry:
+            on_retry(attempt, outcome, delay)
+        time.sleep(delay)
+
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
@@ -0,0 +1,136 @@
+# scripts/resolve_whitelist.py
+# Resolves the "unresolved" source and author names in config/openalex_whitelist.json to
+# OpenAlex ids and writes them back into the "sources" / "authors" lists in place.
+#
+#   python scripts/resolve_whitelist.py [--dry-run] [--min-similarity 0.85]
+#
+# Lookups go through update.openalex_request, so they share its rate limiter, retries and
+# on-disk cache (kept for RESOLVE_CACHE_TTL here, since ids rarely change). OpenAlex search
+# does not take OR-joined names, so one search per name is sent, all names concurrently.
+# Candidates are ranked by name similarity plus a small bonus for works_count.
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import update  # noqa: E402
+
+WHITELIST_PATH = ROOT / "config" / "openalex_whitelist.json"
+RESOLVE_CACHE_TTL = 30 * 24 * 60 * 60
+RESOLVE_CANDIDATES = 10
+MIN_SIMILARITY = 0.85
+WORKS_COUNT_WEIGHT = 0.02
+
+ENTITIES = {
+    "sources": {"endpoint": "sources", "alternates": "alternate_titles"},
+    "authors": {"endpoint": "authors", "alternates": "display_name_alternatives"},
+}
+
+def normalize_name(name):
+    return re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+
+def name_similarity(wanted, candidate):
+    names = [candidate.get("display_name")] + list(candidate.get(ENTITIES[candidate["_kind"]]["alternates"]) or [])
+    target = normalize_name(wanted)
+    return max(
+        (difflib.SequenceMatcher(None, target, normalize_name(name)).ratio() for name in names if name),
+        default=0.0,
+    )
+
+def rank_candidates(kind, name, candidates):
+    ranked = []
+    for candidate in candidates:
+        candidate = dict(candidate, _kind=kind)
+        similarity = name_similarity(name, candidate)
+        score = similarity + WORKS_COUNT_WEIGHT * math.log10(1 + (candidate.get("works_count") or 0))
+        ranked.append((score, similarity, candidate))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return ranked
+
+def search_entity(kind, name):
+    entity = ENTITIES[kind]
+    params = {
+        "search": name,
+        "per-page": RESOLVE_CANDIDATES,
+        "select": f"id,display_name,works_count,{entity['alternates']}",
+    }
+    url = f"{update.OPENALEX_BASE_URL}/{entity['endpoint']}"
+    return update.openalex_request(params, url=url).get("results", [])
+
+def resolve(config, min_similarity):
+    unresolved = config.get("unresolved") or {}
+    jobs = [(kind, name) for kind in ENTITIES for name in unresolved.get(kind) or []]
+    if not jobs:
+        print("Nothing to resolve.")
+        return []
+
+    with ThreadPoolExecutor(max_workers=update.OPENALEX_MAX_WORKERS) as executor:
+        results = list(executor.map(lambda job: search_entity(*job), jobs))
+
+    resolved = []
+    for (kind, name), candidates in zip(jobs, results):
+        ranked = rank_candidates(kind, name, candidates)
+        if not ranked or ranked[0][1] < min_similarity:
+            print(f"{kind[:-1]} {name!r}: no confident match")
+            for score, similarity, candidate in ranked[:3]:
+                print(f"    {candidate['id']}  {candidate.get('display_name')}  similarity={similarity:.2f}  works={candidate.get('works_count')}")
+            continue
+        _, similarity, best = ranked[0]
+        print(f"{kind[:-1]} {name!r} -> {best['id']} ({best.get('display_name')}, similarity={similarity:.2f}, works={best.get('works_count')})")
+        resolved.append((kind, name, best["id"]))
+    return resolved
+
+def apply_resolved(config, resolved):
+    for kind, name, openalex_id in resolved:
+        entries = config.setdefault(kind, [])
+        if not any(entry.get("id") == openalex_id for entry in entries):
+            entries.append({"name": name, "id": openalex_id})
+        config["unresolved"][kind] = [n for n in config["unresolved"][kind] if n != name]
+    return config
+
+def format_whitelist(config):
+    # Same layout as the hand-written file: one {"name", "id"} entry per line.
+    blocks = []
+    for key, value in config.items():
+        if isinstance(value, list) and all(isinstance(entry, dict) for entry in value):
+            lines = ",\n".join(f"    {json.dumps(entry, ensure_ascii=False)}" for entry in value)
+            blocks.append(f'  "{key}": [\n{lines}\n  ]' if value else f'  "{key}": []')
+        elif isinstance(value, dict):
+            lines = ",\n".join(f"    {json.dumps(k)}: {json.dumps(v, ensure_ascii=False)}" for k, v in value.items())
+            blocks.append(f'  "{key}": {{\n{lines}\n  }}' if value else f'  "{key}": {{}}')
+        else:
+            blocks.append(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}")
+    return "{\n" + ",\n".join(blocks) + "\n}\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve unresolved whitelist names to OpenAlex ids.")
+    parser.add_argument("--path", type=Path, default=WHITELIST_PATH)
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    parser.add_argument("--dry-run", action="store_true", help="print matches without rewriting the file")
+    args = parser.parse_args()
+
+    update.OPENALEX_CACHE_DIR = ROOT / ".cache" / "openalex"
+    update.OPENALEX_CACHE_TTL = int(os.getenv("OPENALEX_CACHE_TTL", RESOLVE_CACHE_TTL))
+
+    config = json.loads(args.path.read_text(encoding="utf-8"))
+    resolved = resolve(config, args.min_similarity)
+    if not resolved or args.dry_run:
+        return
+
+    tmp_path = args.path.with_suffix(".tmp")
+    tmp_path.write_text(format_whitelist(apply_resolved(config, resolved)), encoding="utf-8")
+    os.replace(tmp_path, args.path)
+    print(f"Wrote {len(resolved)} resolved ids to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# tests/test_resume.py
+# Offline checks of --resume across runs: each run is a fresh update.main() in its own
+# process, inside a scratch directory, against benchmarks/fake_services.py.
+#
+#   python -m pytest -q tests    (or: python -m unittest discover tests)
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_services import FakeServices  # noqa: E402
+
+TODAY = datetime.now().strftime("%Y-%m-%d")
+LAST_WEEK = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+LAB_PROFILE = {
+    "queries": {"sleep": ["sleep deprivation"]},
+    "relevance_rules": {"sleep": {"core": ["sleep", "decision"], "domain": ["participant", "choice"], "exclude": []}},
+}
+
+class ResumeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.services = FakeServices(120).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.services.stop()
+
+    def setUp(self):
+        self.workdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.workdir, True)
+        (self.workdir / "config").mkdir()
+        shutil.copy(ROOT / "config" / "openalex_whitelist.json", self.workdir / "config")
+        self.env = dict(
+            os.environ,
+            **self.services.env(),
+            OPENALEX_CACHE_TTL="0",
+            OPENALEX_API_KEY="test",
+            DEEPSEEK_API_KEY="test",
+            GITHUB_TOKEN="test",
+        )
+
+    def run_update(self, *argv):
+        # Returns how many requests each fake service got during the run.
+        before = self.services.snapshot_counters()
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, update; update.main(sys.argv[1:])", *argv],
+            cwd=self.workdir,
+            env=dict(self.env, PYTHONPATH=str(ROOT)),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout[-2000:] + result.stderr[-2000:])
+        after = self.services.snapshot_counters()
+        return {name: after[name] - before[name] for name in ("openalex", "llm", "github")}
+
+    def run_dir(self, run_date):
+        return self.workdir / ".cache" / "runs" / run_date
+
+    def snapshot(self, run_date):
+        return self.workdir / "data" / "weekly" / f"{run_date}.json"
+
+    def move_run_to_last_week(self):
+        self.run_dir(TODAY).rename(self.run_dir(LAST_WEEK))
+        for path in (self.workdir / "data" / "weekly").glob(f"{TODAY}*"):
+            path.rename(path.with_name(path.name.replace(TODAY, LAST_WEEK)))
+
+    def test_fetch_crashed_starts_a_fresh_run(self):
+        # A run killed during the fetch leaves no checkpoint for this week; the latest
+        # one is last week's finished run, which must not be replayed.
+        self.run_update()
+        self.move_run_to_last_week()
+        last_week = self.snapshot(LAST_WEEK).read_bytes()
+
+        requests_made = self.run_update("--resume")
+        self.assertGreater(requests_made["openalex"], 0)
+        self.assertEqual(requests_made["github"], 1)
+        self.assertTrue(self.snapshot(TODAY).exists())
+        self.assertTrue((self.run_dir(TODAY) / "issue_posted").exists())
+        self.assertEqual(self.snapshot(LAST_WEEK).read_bytes(), last_week)
+
+    def test_scoring_crashed_reuses_the_candidates(self):
+        # --fetch-only leaves the state of a run that died after the fetch.
+        self.run_update("--fetch-only")
+        candidates = json.loads((self.run_dir(TODAY) / "candidates.json").read_text(encoding="utf-8"))
+
+        requests_made = self.run_update("--resume")
+        self.assertEqual(requests_made["openalex"], 0)
+        self.assertGreater(requests_made["llm"], 0)
+        self.assertEqual(requests_made["github"], 1)
+        scored = json.loads(self.snapshot(TODAY).read_text(encoding="utf-8"))
+        self.assertLessEqual({a["doi"] for a in scored}, {a["doi"] for a in candidates["articles"]})
+
+    def test_issue_already_posted_is_not_posted_again(self):
+        self.run_update()
+        requests_made = self.run_update("--resume")
+        self.assertEqual(requests_made, {"openalex": 0, "llm": 0, "github": 0})
+
+    def test_profile_added_after_the_crash(self):
+        # Only the new profile is fetched and published; the posted issue stays posted.
+        self.run_update()
+        (self.workdir / "config" / "profiles").mkdir()
+        (self.workdir / "config" / "profiles" / "lab.json").write_text(json.dumps(LAB_PROFILE), encoding="utf-8")
+
+        requests_made = self.run_update("--resume")
+        self.assertEqual(requests_made["github"], 1)
+        self.assertTrue((self.run_dir(TODAY) / "issue_posted").exists())
+        self.assertTrue((self.run_dir(TODAY) / "profiles" / "lab" / "issue_posted").exists())
+
+if __name__ == "__main__":
+    unittest.main()
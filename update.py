@@ -1,19 +1,142 @@
 from datetime import datetime, timezone, timedelta
 import json
+import hashlib
+import heapq
+import itertools
+import argparse
+import cProfile
+import pstats
 import requests
 import os
-import re
 import pathlib
-from openai import OpenAI
+import re
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+
+from history import HISTORY_DB_PATH, HistoryStore, score_value
+from metrics import RunMetrics
+from neardup import NearDuplicateIndex, signature
+from prerank import HAS_NUMPY as PRERANK_HAS_NUMPY, PreRanker, select_for_scoring
+from relevance import COMPILED_RULES, any_relevance_matches, compile_relevance_rules, relevance_matches, strip_html
+from resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    call_with_retries,
+    is_transient,
+    outcome_status,
+)
 
 import time
 
-OPENALEX_WORKS_URL = "https://api.openalex.org/works"
+# Endpoints can be pointed elsewhere, e.g. at the local stand-ins in benchmarks/fake_services.py.
+OPENALEX_BASE_URL = os.getenv("OPENALEX_BASE_URL", "https://api.openalex.org")
+OPENALEX_WORKS_URL = f"{OPENALEX_BASE_URL}/works"
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_REPOSITORY = os.getenv("GITHUB_REPOSITORY", "JiangXY98/autoPsydecision")
 OPENALEX_PER_KEYWORD_LIMIT = 10
 OPENALEX_MAX_ARTICLES = 30
 MAX_FUTURE_PUBLICATION_DAYS = 365
-OPENALEX_MAX_RETRIES = 3
-OPENALEX_RETRY_DELAY = 10
+# Attempts per request. Retries back off exponentially with full jitter from RETRY_BASE_DELAY
+# up to RETRY_MAX_DELAY and honour Retry-After. After CIRCUIT_FAILURE_THRESHOLD consecutive
+# failures a service is failed fast for CIRCUIT_RESET_SECONDS instead of being waited on.
+OPENALEX_MAX_RETRIES = 4
+LLM_MAX_RETRIES = 3
+GITHUB_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 60
+OPENALEX_MAX_WORKERS = 4
+# OpenAlex polite pool allows 10 requests/second; stay a little below it.
+OPENALEX_REQUESTS_PER_SECOND = 8
+# DeepSeek scoring runs this many requests in flight; each gets its own timeout.
+LLM_MAX_WORKERS = 4
+LLM_REQUEST_TIMEOUT = 120
+LLM_MODEL = "deepseek-v4-flash"
+LLM_TEMPERATURE = 0.2
+# Articles per batched scoring request; 1 turns batching off.
+LLM_BATCH_SIZE = 5
+LLM_MAX_TOKENS_PER_ARTICLE = 900
+# USD per million tokens, used only for the cost estimate in <run_date>.metrics.json.
+LLM_PROMPT_PRICE_PER_MTOK = float(os.getenv("LLM_PROMPT_PRICE_PER_MTOK", "0.27"))
+LLM_COMPLETION_PRICE_PER_MTOK = float(os.getenv("LLM_COMPLETION_PRICE_PER_MTOK", "1.10"))
+# Near-duplicate check (neardup.py): candidates that are near-copies of one another are
+# merged, and candidates that are near-copies of an article in an earlier snapshot are
+# skipped, whatever their DOIs.
+NEAR_DUPLICATES = os.getenv("NEAR_DUPLICATES", "1") != "0"
+# Local pre-ranking (prerank.py): up to PRERANK_POOL_LIMIT candidates are kept, and only
+# OPENALEX_MAX_ARTICLES go on: cached articles first, then the highest predicted scores,
+# with up to PRERANK_MAX_UNCERTAIN of those slots for text unlike anything scored before. Without numpy or with fewer
+# than PRERANK_MIN_TRAIN scored snapshot articles the newest OPENALEX_MAX_ARTICLES are scored.
+PRERANK = os.getenv("PRERANK", "1") != "0"
+PRERANK_POOL_LIMIT = 150
+PRERANK_MAX_UNCERTAIN = 10
+PRERANK_NOVELTY_THRESHOLD = 0.9
+PRERANK_MIN_TRAIN = 50
+PRERANK_MAX_TRAIN = 2000
+SCORE_CACHE_PATH = pathlib.Path("data/score_cache.jsonl")
+SCORE_CACHE_MAX_AGE_DAYS = 180
+# Two-phase fetch: keyword searches return metadata only and the heavy fields
+# (abstract, authorships, topics) are fetched afterwards for works that pass
+# the metadata filters, OPENALEX_HYDRATE_BATCH ids per request.
+OPENALEX_TWO_PHASE = os.getenv("OPENALEX_TWO_PHASE", "1") != "0"
+OPENALEX_HYDRATE_BATCH = 50
+# Metadata survivors are hydrated this many at a time as they stream in, so only one
+# chunk of abstracts is held in memory.
+OPENALEX_HYDRATE_CHUNK = 1000
+# GitHub rejects issue and comment bodies over 65,536 characters. The report is cut into
+# pages of at most ISSUE_PAGE_LIMIT, ISSUE_PAGE_NOTE_ROOM of which is kept for "part i of n".
+ISSUE_PAGE_LIMIT = 65000
+ISSUE_PAGE_NOTE_ROOM = 100
+ABSTRACT_CACHE_SIZE = 4096
+OPENALEX_LIGHT_FIELDS = [
+    "id",
+    "doi",
+    "title",
+    "display_name",
+    "created_date",
+    "publication_date",
+    "primary_location",
+]
+OPENALEX_HEAVY_FIELDS = [
+    "authorships",
+    "topics",
+    "abstract_inverted_index",
+]
+# "keywords" runs one search per OPENALEX_QUERIES keyword, "whitelist" only fetches the
+# week's works from the sources and authors in OPENALEX_WHITELIST_PATH, "both" does both.
+OPENALEX_FETCH_MODE = os.getenv("OPENALEX_FETCH_MODE", "both")
+OPENALEX_WHITELIST_PATH = pathlib.Path("config/openalex_whitelist.json")
+# Whitelist ids are OR-joined into one filter per request, at most this many ids or
+# characters at a time (OpenAlex caps OR filters at 100 values; URLs should stay short).
+OPENALEX_WHITELIST_CHUNK_IDS = 50
+OPENALEX_WHITELIST_CHUNK_CHARS = 1500
+OPENALEX_WHITELIST_PER_PAGE = 200
+OPENALEX_WHITELIST_MAX_PAGES = 5
+# Whitelisted sources still have to match one of the relevance rules; a whitelisted author
+# is reason enough on their own.
+WHITELIST_SOURCE_QUERY = "whitelist_source"
+WHITELIST_AUTHOR_QUERY = "whitelist_author"
+WEEKLY_DIR = pathlib.Path("data/weekly")
+# Extra topic profiles, one config/profiles/<name>.json each, run next to the built-in one.
+# Their searches share one OpenAlex sweep; snapshots, score cache and history store of a
+# profile live under PROFILE_DATA_DIR/<name>/.
+PROFILES_DIR = pathlib.Path("config/profiles")
+PROFILE_DATA_DIR = pathlib.Path("data/profiles")
+DEFAULT_PROFILE = "default"
+BACKFILL_STATE_DIR = pathlib.Path(".cache/backfill")
+RUN_CHECKPOINT_DIR = pathlib.Path(".cache/runs")
+RUN_CHECKPOINT_KEEP = 4
+BACKFILL_PER_PAGE = 200
+# Upper bound on pages per keyword and week, so broad terms cannot run away.
+BACKFILL_MAX_PAGES = 10
+BACKFILL_MAX_WEEKS_IN_FLIGHT = 2
+OPENALEX_CACHE_DIR = pathlib.Path(".cache/openalex")
+# Seconds a cached OpenAlex response is served without revalidation; 0 disables the cache.
+OPENALEX_CACHE_TTL = int(os.getenv("OPENALEX_CACHE_TTL", 24 * 60 * 60))
 
 OPENALEX_QUERIES = {
     "dishonesty": [
@@ -59,193 +182,31 @@ OPENALEX_QUERIES = {
     ],
 }
 
-RELEVANCE_RULES = {
-    "dishonesty": {
-        "core": [
-            "dishonesty",
-            "cheating",
-            "deception",
-            "honesty",
-            "honest behavior",
-            "moral identity",
-            "self concept maintenance",
-            "reputation management",
-        ],
-        "domain": [
-            "decision making",
-            "choice",
-            "behavior",
-            "behaviour",
-            "experiment",
-            "participant",
-            "psychology",
-            "relationship",
-            "consumer",
-            "economic game",
-            "social norm",
-        ],
-        "exclude": [
-            "legal profession",
-            "legal studies",
-            "religious education",
-            "islamic",
-            "maqasid",
-            "marriage",
-            "wives rights",
-            "anti corruption",
-            "professional misconduct",
-        ],
-    },
-    "decision_process": {
-        "core": [
-            "drift diffusion",
-            "hddm",
-            "evidence accumulation",
-            "sequential sampling",
-            "reinforcement learning",
-            "computational psychiatry",
-            "computational modeling",
-            "computational modelling",
-        ],
-        "domain": [
-            "choice",
-            "behavior",
-            "behaviour",
-            "cognitive",
-            "psychology",
-            "psychiatry",
-            "neural",
-            "brain",
-            "reward",
-            "participant",
-            "human",
-        ],
-        "exclude": [
-            "lyapunov",
-            "barrier function",
-            "barrier functions",
-            "robotics",
-            "autonomous vehicle",
-            "control systems",
-        ],
-    },
-    "cognitive_control": {
-        "core": [
-            "cognitive control",
-            "executive control",
-            "self control",
-            "response inhibition",
-            "conflict monitoring",
-            "expected value of control",
-        ],
-        "domain": [
-            "decision",
-            "choice",
-            "behavior",
-            "behaviour",
-            "attention",
-            "task",
-            "inhibition",
-            "conflict",
-            "neural",
-            "brain",
-            "participant",
-            "human",
-        ],
-    },
-    "consumer_decision": {
-        "core": [
-            "consumer decision",
-            "consumer behavior",
-            "consumer behaviour",
-            "value based decision",
-            "value based choice",
-            "intertemporal choice",
-            "delay discounting",
-            "loss aversion",
-            "risk preference",
-        ],
-        "domain": [
-            "consumer",
-            "purchase",
-            "choice",
-            "decision",
-            "preference",
-            "behavior",
-            "behaviour",
-            "reward",
-            "participant",
-            "human",
-        ],
-    },
-    "additional_decision_topics": {
-        "core": [
-            "decision conflict",
-            "choice architecture",
-            "moral behavior",
-            "moral behaviour",
-            "honest behavior",
-        ],
-        "domain": [
-            "decision",
-            "choice",
-            "behavior",
-            "behaviour",
-            "experiment",
-            "psychology",
-            "social",
-            "moral",
-            "participant",
-            "human",
-        ],
-    },
-}
-
-STRONG_TITLE_TERMS = {
-    "dishonesty": [
-        "dishonesty",
-        "cheating",
-        "deception",
-        "prosocial lying",
-    ],
-    "decision_process": [
-        "drift diffusion",
-        "hddm",
-        "evidence accumulation",
-        "sequential sampling",
-        "computational psychiatry",
-    ],
-    "cognitive_control": [
-        "cognitive control",
-        "executive control",
-        "response inhibition",
-        "conflict monitoring",
-        "expected value of control",
-    ],
-    "consumer_decision": [
-        "consumer decision",
-        "consumer behavior",
-        "intertemporal choice",
-        "delay discounting",
-        "loss aversion",
-        "risk preference",
-    ],
-    "additional_decision_topics": [
-        "decision conflict",
-        "choice architecture",
-        "moral behavior",
-        "honest behavior",
-    ],
-}
-
 access_token = os.getenv('GITHUB_TOKEN')
 deepseekapikey = os.getenv('DEEPSEEK_API_KEY')
 openalex_api_key = os.getenv('OPENALEX_API_KEY')
 
-client = OpenAI(
-    api_key=deepseekapikey,
-    base_url="https://api.deepseek.com/v1"
-)
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client():
+    # openai is by far the slowest import, so it only happens once scoring actually runs.
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            from openai import OpenAI
+
+            # Retries are handled by call_with_retries, alongside OpenAlex and GitHub.
+            _llm_client = OpenAI(
+                api_key=deepseekapikey,
+                base_url=DEEPSEEK_BASE_URL,
+                max_retries=0,
+            )
+    return _llm_client
+
+SYSTEM_PROMPT = "You are a careful and conservative academic reviewer."
 
 JSON_PROMPT = """
 You are a senior researcher in decision neuroscience and computational psychology.
@@ -327,56 +288,35 @@ Return a valid JSON object only (no extra text):
 }
 """
 
-def strip_html(x: str) -> str:
-    return re.sub(r"<[^>]+>", " ", x or "").strip()
-
-def normalize_for_match(x: str) -> str:
-    x = strip_html(x).lower()
-    x = re.sub(r"[-_/]", " ", x)
-    x = re.sub(r"[^a-z0-9\s]", " ", x)
-    return re.sub(r"\s+", " ", x).strip()
-
-def matched_terms(text: str, terms):
-    return [term for term in terms if normalize_for_match(term) in text]
-
-def has_enough_text_for_filter(query_name: str, title: str, abstract: str):
-    abstract_words = normalize_for_match(abstract).split()
-    if len(abstract_words) >= 30:
-        return True
-
-    title_text = normalize_for_match(title)
-    return bool(matched_terms(title_text, STRONG_TITLE_TERMS.get(query_name, [])))
-
-def relevance_matches(query_name: str, title: str, abstract: str):
-    rule = RELEVANCE_RULES.get(query_name)
-    if not rule:
-        return []
-
-    if not has_enough_text_for_filter(query_name, title, abstract):
-        return []
-
-    text = normalize_for_match(f"{title} {abstract}")
-    if matched_terms(text, rule.get("exclude", [])):
-        return []
-
-    core_matches = matched_terms(text, rule["core"])
-    domain_matches = matched_terms(text, rule["domain"])
-
-    if core_matches and domain_matches:
-        return sorted(set(core_matches + domain_matches))
-
-    return []
-
 def reconstruct_abstract(inverted_index):
+    # Each word is dropped straight into its slot of a list sized by the word count, so
+    # decoding is O(n) with no sort. Gaps leave slots empty (and grow the list when they
+    # push positions past its end); a position claimed by two words keeps the first.
+    # Negative positions are dropped. Positions far past the end are kept aside and
+    # placed in order at the end, so one stray index cannot allocate a huge list.
     if not inverted_index:
         return ""
-
-    words = []
+    slots = [None] * sum(map(len, inverted_index.values()))
+    far = {}
     for word, positions in inverted_index.items():
         for position in positions:
-            words.append((position, word))
-
-    return " ".join(word for _, word in sorted(words))
+            if position < 0:
+                continue
+            try:
+                if slots[position] is None:
+                    slots[position] = word
+            except IndexError:
+                if position > 2 * len(slots) + 1024:
+                    far.setdefault(position, word)
+                    continue
+                slots.extend([None] * (position + 1 - len(slots)))
+                slots[position] = word
+    for position in sorted(far):
+        if position >= len(slots):
+            slots.append(far[position])
+        elif slots[position] is None:
+            slots[position] = far[position]
+    return " ".join(filter(None, slots))
 
 def extract_authors(authorships, max_authors=8):
     authors = []
@@ -425,209 +365,1082 @@ def safe_json_loads(s: str):
             return json.loads(s[start:end+1])
         raise
         
-def extract_scores_and_reasons(title: str, abstract: str):
-    response = client.chat.completions.create(
-        model="deepseek-v4-flash",
+BATCH_PROMPT = """
+=== Batch Mode ===
+
+You will be given several articles, each introduced by "ARTICLE <index>".
+Score every article independently, exactly as if it were the only one.
+
+Return a valid JSON object only (no extra text):
+
+{
+  "results": [
+    {"index": <article index>, <all fields from the Output Format above>},
+    ...
+  ]
+}
+
+Include exactly one entry per article.
+"""
+
+def parse_score_object(obj):
+    if not isinstance(obj, dict):
+        raise ValueError("score payload is not a JSON object")
+
+    research_score = "N/A"
+    impact_score = "N/A"
+    rq = obj.get("research_quality_score")
+    pi = obj.get("potential_impact_score")
+    if rq is not None:
+        research_score = int(float(rq))
+    if pi is not None:
+        impact_score = int(float(pi))
+    reasoning_research = str(obj.get("research_reasoning", "")).strip() or "N/A"
+    reasoning_impact = str(obj.get("impact_reasoning", "")).strip() or "N/A"
+    topic_tags = obj.get("topic_tags", []) or []
+    method_tags = obj.get("method_tags", []) or []
+
+    return research_score, reasoning_research, impact_score, reasoning_impact, topic_tags, method_tags
+
+def is_transient_llm_error(outcome):
+    from openai import APIConnectionError
+
+    return is_transient(outcome) or isinstance(outcome, APIConnectionError)
+
+def create_chat_completion(**kwargs):
+    def send():
+        start = time.perf_counter()
+        try:
+            response = get_llm_client().chat.completions.create(**kwargs)
+        except Exception as exc:
+            metrics.record_request("llm", time.perf_counter() - start, getattr(exc, "status_code", None) or type(exc).__name__)
+            raise
+        metrics.record_request("llm", time.perf_counter() - start, 200)
+        metrics.record_usage(getattr(response, "usage", None))
+        return response
+
+    return call_with_retries(
+        send, llm_retry, llm_breaker, retryable=is_transient_llm_error, on_retry=retry_logger("DeepSeek", "llm")
+    )
+
+def extract_scores_and_reasons(title: str, abstract: str, prompt=None):
+    response = create_chat_completion(
+        model=LLM_MODEL,
         messages=[
-            {"role": "system", "content": "You are a careful and conservative academic reviewer."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {
                 "role": "user",
                 "content": (
-                    f"{JSON_PROMPT}\n\n"
+                    f"{prompt or JSON_PROMPT}\n\n"
                     f"=== Article to Evaluate ===\n"
                     f"TITLE:\n{title}\n\n"
                     f"ABSTRACT:\n{abstract}\n"
                 ),
             },
         ],
-        max_tokens=900,
-        temperature=0.2,
+        max_tokens=LLM_MAX_TOKENS_PER_ARTICLE,
+        temperature=LLM_TEMPERATURE,
         response_format={"type": "json_object"},
+        timeout=LLM_REQUEST_TIMEOUT,
     )
 
     generated = response.choices[0].message.content.strip()
 
-    # Defaults (robust fallback)
-    research_score = "N/A"
-    reasoning_research = "N/A"
-    impact_score = "N/A"
-    reasoning_impact = "N/A"
-    topic_tags = []
-    method_tags = []
-
     try:
-        obj = safe_json_loads(generated)
-        rq = obj.get("research_quality_score")
-        pi = obj.get("potential_impact_score")
-        if rq is not None:
-            research_score = int(float(rq))
-        if pi is not None:
-            impact_score = int(float(pi))
-        reasoning_research = str(obj.get("research_reasoning", "")).strip() or "N/A"
-        reasoning_impact = str(obj.get("impact_reasoning", "")).strip() or "N/A"
-        topic_tags = obj.get("topic_tags", []) or []
-        method_tags = obj.get("method_tags", []) or []
+        return parse_score_object(safe_json_loads(generated))
     except Exception:
         print(f"Failed to parse model output for: {title}")
         print(generated[:500])
 
-    return research_score, reasoning_research, impact_score, reasoning_impact, topic_tags, method_tags
-
-def openalex_request(params):
-    if not openalex_api_key:
-        raise RuntimeError("OPENALEX_API_KEY is not set")
+    # Defaults (robust fallback)
+    return "N/A", "N/A", "N/A", "N/A", [], []
+
+def extract_scores_batch(items, prompt=None):
+    # items is a list of (title, abstract); returns one score tuple per item, or None
+    # where the reply had no usable entry so the caller can fall back to a single call.
+    articles_text = "".join(
+        f"=== ARTICLE {index} ===\n"
+        f"TITLE:\n{title}\n\n"
+        f"ABSTRACT:\n{abstract}\n\n"
+        for index, (title, abstract) in enumerate(items)
+    )
+    response = create_chat_completion(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"{prompt or JSON_PROMPT}\n{BATCH_PROMPT}\n{articles_text}",
+            },
+        ],
+        max_tokens=min(LLM_MAX_TOKENS_PER_ARTICLE * len(items), 8000),
+        temperature=LLM_TEMPERATURE,
+        response_format={"type": "json_object"},
+        timeout=LLM_REQUEST_TIMEOUT,
+    )
 
-    params = dict(params)
-    params["api_key"] = openalex_api_key
+    generated = response.choices[0].message.content.strip()
+    results = [None] * len(items)
+    try:
+        entries = safe_json_loads(generated).get("results") or []
+    except Exception:
+        print(f"Failed to parse batched model output for {len(items)} articles.")
+        print(generated[:500])
+        return results
 
-    for attempt in range(OPENALEX_MAX_RETRIES):
+    for entry in entries:
         try:
-            response = requests.get(OPENALEX_WORKS_URL, params=params, timeout=30)
-            if response.status_code == 503 and attempt < OPENALEX_MAX_RETRIES - 1:
-                print(f"OpenAlex 503 on attempt {attempt + 1}, retrying in {OPENALEX_RETRY_DELAY}s...")
-                time.sleep(OPENALEX_RETRY_DELAY)
-                continue
-            response.raise_for_status()
-            return response.json()
-        except requests.ConnectionError as exc:
-            if attempt < OPENALEX_MAX_RETRIES - 1:
-                print(f"OpenAlex connection error on attempt {attempt + 1}, retrying in {OPENALEX_RETRY_DELAY}s...")
-                time.sleep(OPENALEX_RETRY_DELAY)
-                continue
-            raise
+            index = int(entry.get("index"))
+            scores = parse_score_object(entry)
+        except Exception:
+            continue
+        if not 0 <= index < len(items) or results[index] is not None:
+            continue
+        if scores[0] == "N/A" or scores[2] == "N/A":
+            continue
+        results[index] = scores
+
+    return results
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+openalex_rate_limiter = TokenBucket(OPENALEX_REQUESTS_PER_SECOND)
+
+def make_http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=OPENALEX_MAX_WORKERS * 2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+http_session = make_http_session()
+
+metrics = RunMetrics(LLM_PROMPT_PRICE_PER_MTOK, LLM_COMPLETION_PRICE_PER_MTOK)
+
+openalex_retry = RetryPolicy(OPENALEX_MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+llm_retry = RetryPolicy(LLM_MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+github_retry = RetryPolicy(GITHUB_MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+openalex_breaker = CircuitBreaker("openalex", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+llm_breaker = CircuitBreaker("llm", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+github_breaker = CircuitBreaker("github", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+
+def retry_logger(label, service):
+    def on_retry(attempt, outcome, delay):
+        metrics.count(f"{service}_retries")
+        reason = outcome_status(outcome) or type(outcome).__name__
+        print(f"{label} {reason} on attempt {attempt + 1}, retrying in {delay:.1f}s...")
+    return on_retry
+
+def openalex_cache_key(url, params):
+    # api_key never takes part in the key, so rotating the secret keeps the cache warm.
+    normalized = sorted(
+        (str(k), str(v).strip()) for k, v in params.items() if k != "api_key"
+    )
+    raw = json.dumps([url, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    raise RuntimeError("OpenAlex request failed after max retries")
+def read_openalex_cache(key):
+    if OPENALEX_CACHE_TTL <= 0:
+        return None
+    path = OPENALEX_CACHE_DIR / f"{key}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
 
-def add_openalex_work(articles_by_key, work, query_name, keyword):
-    openalex_id = work.get("id") or ""
-    doi = work.get("doi") or ""
-    if not doi:
+def write_openalex_cache(key, entry):
+    if OPENALEX_CACHE_TTL <= 0:
         return
-    dedupe_key = doi.lower()
-
-    title = work.get("title") or work.get("display_name") or "N/A"
-    abstract = reconstruct_abstract(work.get("abstract_inverted_index"))
-    local_matches = relevance_matches(query_name, title, abstract)
-    if not local_matches:
+    OPENALEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = OPENALEX_CACHE_DIR / f"{key}.json"
+    tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def prune_openalex_cache():
+    # Run once at startup: entries (and temp files left by a crash) untouched for longer
+    # than OPENALEX_CACHE_TTL are deleted, so backfill pages and hydrate batches that are
+    # fetched once do not pile up.
+    if not OPENALEX_CACHE_DIR.is_dir():
         return
+    cutoff = time.time() - max(OPENALEX_CACHE_TTL, 0)
+    removed = 0
+    for path in OPENALEX_CACHE_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        print(f"OpenAlex cache: removed {removed} expired entries.")
+
+SCORE_FIELDS = (
+    "research_score",
+    "reasoning_research",
+    "impact_score",
+    "reasoning_impact",
+    "topic_tags",
+    "method_tags",
+)
 
-    source = ((work.get("primary_location") or {}).get("source") or {})
-    journal = source.get("display_name") or "N/A"
-    source_type = source.get("type") or "N/A"
-    publication_date = work.get("publication_date") or "N/A"
+def normalize_doi(doi):
+    doi = (doi or "").strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.strip()
+
+def prompt_fingerprint(prompt=None):
+    raw = f"{SYSTEM_PROMPT}\n{prompt or JSON_PROMPT}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+class ScoreCache:
+    # Append-only JSONL of LLM scores keyed by DOI + prompt fingerprint + model + temperature.
+    # Entries written under an older prompt or past max_age_days are dropped on load and
+    # the file is compacted at the end of the run.
+
+    def __init__(self, path, fingerprint, model, temperature, max_age_days):
+        self.path = pathlib.Path(path)
+        self.fingerprint = fingerprint
+        self.model = model
+        self.temperature = temperature
+        self.max_age_days = max_age_days
+        self.entries = {}
+        self.loaded = False
+        self.needs_compact = False
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, doi):
+        return f"{normalize_doi(doi)}|{self.fingerprint}|{self.model}|{self.temperature}"
+
+    def load(self):
+        if self.loaded:
+            return self
+        self.loaded = True
+        if not self.path.exists():
+            return self
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        expired = 0
+        invalidated = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    scored_at = datetime.fromisoformat(entry["scored_at"])
+                except (ValueError, KeyError, TypeError):
+                    self.needs_compact = True
+                    continue
+                if entry.get("prompt_hash") != self.fingerprint:
+                    invalidated += 1
+                    continue
+                if scored_at < cutoff:
+                    expired += 1
+                    continue
+                if entry["key"] in self.entries:
+                    self.needs_compact = True
+                self.entries[entry["key"]] = entry
+
+        if invalidated:
+            print(f"JSON_PROMPT changed; invalidated {invalidated} cached scores.")
+        if expired:
+            print(f"Evicted {expired} cached scores older than {self.max_age_days} days.")
+        if invalidated or expired:
+            self.needs_compact = True
+        return self
+
+    def get(self, doi):
+        if normalize_doi(doi) in ("", "n/a"):
+            return None
+        with self.lock:
+            entry = self.entries.get(self.key(doi))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return tuple(entry["scores"][field] for field in SCORE_FIELDS)
+
+    def contains(self, doi):
+        # Like get() != None, without counting a hit or miss.
+        with self.lock:
+            return self.key(doi) in self.entries
+
+    def put(self, doi, scores):
+        if normalize_doi(doi) in ("", "n/a"):
+            return
+        # Fallback results are not worth remembering; retry them next week.
+        if scores[0] == "N/A" or scores[2] == "N/A":
+            return
+        entry = {
+            "key": self.key(doi),
+            "doi": normalize_doi(doi),
+            "prompt_hash": self.fingerprint,
+            "model": self.model,
+            "temperature": self.temperature,
+            "scored_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "scores": dict(zip(SCORE_FIELDS, scores)),
+        }
+        with self.lock:
+            self.entries[entry["key"]] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def compact(self):
+        if not self.needs_compact:
+            return
+        with self.lock:
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            self.needs_compact = False
+
+history_store = HistoryStore(HISTORY_DB_PATH)
+decoded_abstracts = {}
+decoded_abstracts_lock = threading.Lock()
+
+score_cache = ScoreCache(
+    SCORE_CACHE_PATH,
+    prompt_fingerprint(),
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    SCORE_CACHE_MAX_AGE_DAYS,
+)
 
-    if source_type != "journal":
-        return
+class Profile:
+    # One reader's keyword searches, relevance rules, whitelist, scoring prompt and issue
+    # repository, with the snapshot directory, score cache and history store that go with
+    # them. Scores depend on the prompt, so profiles never share a score cache.
+
+    def __init__(self, name, queries, compiled_rules, prompt, whitelist_path, repository, weekly_dir, cache, store):
+        self.name = name
+        self.queries = queries
+        self.compiled_rules = compiled_rules
+        self.prompt = prompt
+        self.whitelist_path = whitelist_path
+        self.repository = repository
+        self.weekly_dir = weekly_dir
+        self.score_cache = cache
+        self.history_store = store
+
+# The built-in profile keeps the original data/ layout.
+default_profile = Profile(
+    DEFAULT_PROFILE,
+    OPENALEX_QUERIES,
+    COMPILED_RULES,
+    JSON_PROMPT,
+    OPENALEX_WHITELIST_PATH,
+    GITHUB_REPOSITORY,
+    WEEKLY_DIR,
+    score_cache,
+    history_store,
+)
 
-    if journal.lower().startswith("frontiers in "):
-        return
+def load_profile(path):
+    # config/profiles/<name>.json: "queries" (rule name -> keywords) and "relevance_rules"
+    # (rule name -> core/domain/exclude terms) as in relevance.py, plus optional
+    # "strong_title_terms", "prompt" or "prompt_file" (in place of JSON_PROMPT; it must ask
+    # for the same JSON fields), "whitelist" (a file like OPENALEX_WHITELIST_PATH) and
+    # "github_repository". Like every other path here, prompt_file and whitelist are
+    # relative to the working directory (the repository root).
+    try:
+        config = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Could not read profile {path}: {exc}")
+    name = config.get("name") or path.stem
+    if name == DEFAULT_PROFILE or not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9_-]*", name):
+        raise SystemExit(f"Profile {path} needs a name of letters, digits, - and _ other than {DEFAULT_PROFILE!r}.")
+    queries = config.get("queries")
+    if not isinstance(queries, dict) or not queries:
+        raise SystemExit(f"Profile {name} has no \"queries\".")
+    rules = config.get("relevance_rules") or {}
+    for rule_name, rule in rules.items():
+        if not isinstance(rule, dict) or not all(isinstance(rule.get(key), list) for key in ("core", "domain")):
+            raise SystemExit(f"Profile {name}: relevance rule {rule_name!r} needs \"core\" and \"domain\" term lists.")
+        if not isinstance(rule.get("exclude", []), list):
+            raise SystemExit(f"Profile {name}: \"exclude\" of relevance rule {rule_name!r} must be a list.")
+    for query_name in queries:
+        if query_name not in rules:
+            print(f"Profile {name}: no relevance rule for {query_name!r}; its searches can match nothing.")
+
+    prompt = config.get("prompt")
+    if not prompt and config.get("prompt_file"):
+        prompt_path = pathlib.Path(config["prompt_file"])
+        try:
+            prompt = prompt_path.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise SystemExit(f"Profile {name}: could not read prompt_file {prompt_path}: {exc}")
+    prompt = prompt or JSON_PROMPT
+    whitelist_path = pathlib.Path(config["whitelist"]) if config.get("whitelist") else None
+    if whitelist_path is not None and not whitelist_path.is_file():
+        raise SystemExit(f"Profile {name}: whitelist {whitelist_path} does not exist.")
+    data_dir = PROFILE_DATA_DIR / name
+    return Profile(
+        name,
+        queries,
+        compile_relevance_rules(rules, config.get("strong_title_terms") or {}),
+        prompt,
+        whitelist_path,
+        config.get("github_repository") or GITHUB_REPOSITORY,
+        data_dir / "weekly",
+        ScoreCache(
+            data_dir / "score_cache.jsonl",
+            prompt_fingerprint(prompt),
+            LLM_MODEL,
+            LLM_TEMPERATURE,
+            SCORE_CACHE_MAX_AGE_DAYS,
+        ),
+        HistoryStore(data_dir / "history.sqlite"),
+    )
+
+def load_profiles(directory=None):
+    # The built-in profile first, then one per config file in name order.
+    directory = pathlib.Path(directory or PROFILES_DIR)
+    profiles = [default_profile]
+    for path in sorted(directory.glob("*.json")):
+        profile = load_profile(path)
+        if any(other.name == profile.name for other in profiles):
+            raise SystemExit(f"Two profiles are named {profile.name!r}.")
+        profiles.append(profile)
+    return profiles
+
+def openalex_request(params, url=None):
+    if not openalex_api_key:
+        raise RuntimeError("OPENALEX_API_KEY is not set")
+
+    url = url or OPENALEX_WORKS_URL
+    # A page past the first is keyed by a cursor OpenAlex hands out once, so it would never
+    # be read again; only first pages and single requests are cached.
+    cache_key = openalex_cache_key(url, params) if params.get("cursor", "*") == "*" else None
+    cached = read_openalex_cache(cache_key) if cache_key else None
+    if cached and time.time() - cached.get("fetched_at", 0) < OPENALEX_CACHE_TTL:
+        metrics.record_cache("openalex", True)
+        return cached["data"]
+    if cache_key:
+        metrics.record_cache("openalex", False)
+
+    # A stale entry is still useful: revalidate it with a conditional request.
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
 
-    if not publication_date_is_reasonable(publication_date):
+    params = dict(params)
+    params["api_key"] = openalex_api_key
+
+    def send():
+        with metrics.span("openalex_rate_limit_wait"):
+            openalex_rate_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            response = http_session.get(url, params=params, headers=headers, timeout=30)
+        except requests.RequestException as exc:
+            metrics.record_request("openalex", time.perf_counter() - start, type(exc).__name__)
+            raise
+        metrics.record_request("openalex", time.perf_counter() - start, response.status_code)
+        return response
+
+    response = call_with_retries(send, openalex_retry, openalex_breaker, on_retry=retry_logger("OpenAlex", "openalex"))
+    if response.status_code == 304 and cached:
+        metrics.count("openalex_revalidated")
+        cached["fetched_at"] = time.time()
+        write_openalex_cache(cache_key, cached)
+        return cached["data"]
+    response.raise_for_status()
+    data = response.json()
+    if cache_key:
+        write_openalex_cache(cache_key, {
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "data": data,
+        })
+    return data
+
+def work_source(work):
+    return (work.get("primary_location") or {}).get("source") or {}
+
+# Filter stages run cheapest first; a work is dropped by the first stage that
+# rejects it, so the abstract is only rebuilt for works that survive the metadata checks.
+def has_doi(ctx):
+    return bool(ctx["work"].get("doi"))
+
+def is_journal_source(ctx):
+    return (work_source(ctx["work"]).get("type") or "N/A") == "journal"
+
+def is_not_frontiers(ctx):
+    journal = work_source(ctx["work"]).get("display_name") or "N/A"
+    return not journal.lower().startswith("frontiers in ")
+
+def has_reasonable_publication_date(ctx):
+    return publication_date_is_reasonable(ctx["work"].get("publication_date") or "N/A")
+
+def work_abstract(work):
+    # The same work usually comes back from several searches; decode it once per id.
+    # Empty results are not remembered, in case a later copy of the work has its abstract.
+    # Backfill weeks run concurrently, so eviction happens under the lock.
+    key = work.get("id")
+    abstract = decoded_abstracts.get(key) if key else None
+    if abstract is None:
+        abstract = reconstruct_abstract(work.get("abstract_inverted_index"))
+        if key and abstract:
+            with decoded_abstracts_lock:
+                if len(decoded_abstracts) >= ABSTRACT_CACHE_SIZE:
+                    decoded_abstracts.pop(next(iter(decoded_abstracts)), None)
+                decoded_abstracts[key] = abstract
+    return abstract
+
+def ctx_abstract(ctx):
+    # Decoded the first time a stage asks for it.
+    if "abstract" not in ctx:
+        ctx["abstract"] = work_abstract(ctx["work"])
+    return ctx["abstract"]
+
+def is_hydrated(ctx):
+    return all(field in ctx["work"] for field in OPENALEX_HEAVY_FIELDS)
+
+def is_relevant(ctx):
+    # Judged by the rules of the profile the work was fetched for (ctx["rules"]).
+    work = ctx["work"]
+    rules = ctx.get("rules", COMPILED_RULES)
+    ctx["title"] = work.get("title") or work.get("display_name") or "N/A"
+    if ctx["query_name"] == WHITELIST_AUTHOR_QUERY:
+        ctx["matches"] = any_relevance_matches(ctx["title"], ctx_abstract(ctx), rules)
+        return True
+    if ctx["query_name"] == WHITELIST_SOURCE_QUERY:
+        ctx["matches"] = any_relevance_matches(ctx["title"], ctx_abstract(ctx), rules)
+    elif ctx["query_name"] in rules:
+        ctx["matches"] = relevance_matches(ctx["query_name"], ctx["title"], ctx_abstract(ctx), rules)
+    else:
+        # No rule for this search, so nothing can match and the abstract is not needed.
+        ctx["matches"] = []
+    return bool(ctx["matches"])
+
+# Metadata stages only need the fields fetched in phase one of a two-phase fetch.
+METADATA_FILTER_STAGES = [
+    ("missing_doi", has_doi),
+    ("not_journal", is_journal_source),
+    ("frontiers", is_not_frontiers),
+    ("unreasonable_publication_date", has_reasonable_publication_date),
+]
+CONTENT_FILTER_STAGES = [
+    ("hydrate_failed", is_hydrated),
+    ("not_relevant", is_relevant),
+]
+FILTER_STAGES = METADATA_FILTER_STAGES + CONTENT_FILTER_STAGES
+
+class FilterStats:
+    # Rejections and time spent per filter stage. Only touched from the merge loop,
+    # which runs on the main thread.
+
+    def __init__(self, stages=FILTER_STAGES):
+        self.checked = {name: 0 for name, _ in stages}
+        self.rejected = {name: 0 for name, _ in stages}
+        self.seconds = {name: 0.0 for name, _ in stages}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for stage in data.get("stages", []):
+            if stage["name"] in stats.checked:
+                stats.checked[stage["name"]] = stage["checked"]
+                stats.rejected[stage["name"]] = stage["rejected"]
+                stats.seconds[stage["name"]] = stage["seconds"]
+        return stats
+
+    def as_dict(self):
+        names = list(self.checked)
+        return {
+            "seen": self.checked[names[0]],
+            "accepted": self.checked[names[-1]] - self.rejected[names[-1]],
+            "stages": [
+                {
+                    "name": name,
+                    "checked": self.checked[name],
+                    "rejected": self.rejected[name],
+                    "seconds": round(self.seconds[name], 6),
+                }
+                for name in names
+            ],
+        }
+
+def run_filter_stages(ctx, stats=None, stages=FILTER_STAGES):
+    for name, predicate in stages:
+        start = time.perf_counter()
+        passed = predicate(ctx)
+        if stats is not None:
+            stats.checked[name] += 1
+            stats.seconds[name] += time.perf_counter() - start
+            if not passed:
+                stats.rejected[name] += 1
+        if not passed:
+            return False
+    return True
+
+def openalex_source_label(query_name, keyword):
+    if query_name == WHITELIST_SOURCE_QUERY:
+        return f"whitelist:source: {keyword}"
+    if query_name == WHITELIST_AUTHOR_QUERY:
+        return f"whitelist:author: {keyword}"
+    return f"keyword:{query_name}: {keyword}"
+
+def recency_priority(article):
+    return article.get("created_date") or ""
+
+def whitelist_priority(article):
+    whitelisted = any(label.startswith("whitelist:") for label in article["source_queries"])
+    return whitelisted, recency_priority(article)
+
+def matched_terms_priority(article):
+    return len(article["matched_relevance_terms"]), recency_priority(article)
+
+CANDIDATE_PRIORITIES = {
+    "recency": recency_priority,
+    "whitelist": whitelist_priority,
+    "matched_terms": matched_terms_priority,
+}
+CANDIDATE_PRIORITY = os.getenv("CANDIDATE_PRIORITY", "recency")
+
+class CandidatePool:
+    # The best `limit` candidates by priority(article), kept in a bounded min-heap while
+    # works stream in, so memory stays O(limit) however many works are fetched. Ties go to
+    # the candidate offered first. Merging more labels into a candidate can change its
+    # priority; the old heap entry is then left in place and skipped when it comes up
+    # (lazy deletion), and the heap is rebuilt once stale entries outnumber live ones.
+    # A candidate that was evicted and comes back starts over with only its new labels.
+
+    def __init__(self, limit, priority=None):
+        if priority is None:
+            if CANDIDATE_PRIORITY not in CANDIDATE_PRIORITIES:
+                raise SystemExit(
+                    f"CANDIDATE_PRIORITY must be one of {', '.join(CANDIDATE_PRIORITIES)}, not {CANDIDATE_PRIORITY!r}"
+                )
+            priority = CANDIDATE_PRIORITIES[CANDIDATE_PRIORITY]
+        self.limit = limit
+        self.priority = priority
+        self.entries = {}  # key -> [article, sequence, priority]
+        self.heap = []
+        self.sequence = 0
+        self.seen = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def offer(self, key, article):
+        priority = self.priority(article)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.seen += 1
+            self.sequence += 1
+            entry = self.entries[key] = [article, self.sequence, priority]
+        elif entry[2] == priority:
+            return
+        else:
+            entry[2] = priority
+        heapq.heappush(self.heap, (priority, -entry[1], key))
+
+        if len(self.entries) > self.limit:
+            self.evict()
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = [(priority, -sequence, key) for key, (_, sequence, priority) in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def evict(self):
+        while self.heap:
+            priority, negative_sequence, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] == priority and entry[1] == -negative_sequence:
+                del self.entries[key]
+                return
+
+    def best(self):
+        ranked = sorted(self.entries.values(), key=lambda entry: (entry[2], -entry[1]), reverse=True)
+        return [article for article, _, _ in ranked]
+
+    def items(self):
+        # Candidates in the order they were first offered, for checkpoints.
+        return [article for article, _, _ in sorted(self.entries.values(), key=lambda entry: entry[1])]
+
+    def restore(self, articles, seen=None):
+        for article in articles:
+            self.offer(article["doi"].lower(), article)
+        self.seen = seen if seen is not None else len(self.entries)
+        return self
+
+def add_openalex_work(pool, work, query_name, keyword, stats=None, stages=FILTER_STAGES, rules=None):
+    ctx = {"work": work, "query_name": query_name, "rules": COMPILED_RULES if rules is None else rules}
+    if not run_filter_stages(ctx, stats, stages):
         return
 
-    article = articles_by_key.setdefault(dedupe_key, {
-        "title": title,
+    doi = work["doi"]
+    source = work_source(work)
+    key = doi.lower()
+    article = pool.get(key) or {
+        "title": ctx["title"],
         "authors": extract_authors(work.get("authorships")),
-        "abstract": abstract,
+        "abstract": ctx_abstract(ctx),
         "keywords": extract_openalex_keywords(work.get("topics")),
-        "doi": doi or "N/A",
-        "journal": journal,
-        "source_type": source_type,
+        "doi": doi,
+        "journal": source.get("display_name") or "N/A",
+        "source_type": source.get("type") or "N/A",
         "created_date": work.get("created_date") or "N/A",
-        "publication_date": publication_date,
-        "openalex_id": openalex_id,
+        "publication_date": work.get("publication_date") or "N/A",
+        "openalex_id": work.get("id") or "",
         "source_queries": [],
         "matched_relevance_terms": [],
-    })
-    source_label = f"keyword:{query_name}: {keyword}"
+    }
+    source_label = openalex_source_label(query_name, keyword)
     if source_label not in article["source_queries"]:
         article["source_queries"].append(source_label)
-    for term in local_matches:
+    for term in ctx["matches"]:
         if term not in article["matched_relevance_terms"]:
             article["matched_relevance_terms"].append(term)
+    pool.offer(key, article)
+
+def openalex_date_filter(date_field, from_date, to_date=None):
+    date_filter = f"from_{date_field}:{from_date}"
+    if to_date:
+        date_filter += f",to_{date_field}:{to_date}"
+    return date_filter
+
+def openalex_keyword_params(keyword, date_field, from_date, select, to_date=None, per_page=None):
+    return {
+        "search": keyword,
+        "filter": f"{openalex_date_filter(date_field, from_date, to_date)},type:article",
+        "per-page": per_page or OPENALEX_PER_KEYWORD_LIMIT,
+        "sort": f"{date_field}:desc",
+        "select": select,
+    }
 
-def get_openalex_articles():
-    articles_by_key = {}
-    from_date = (datetime.now(timezone.utc) - timedelta(days=7)).date().isoformat()
-    date_filter_field = "from_created_date"
-    sort_field = "created_date"
-    fallback_notice_printed = False
-    select = ",".join([
-        "id",
-        "doi",
-        "title",
-        "display_name",
-        "created_date",
-        "publication_date",
-        "primary_location",
-        "authorships",
-        "topics",
-        "abstract_inverted_index",
-    ])
-
-    for query_name, keywords in OPENALEX_QUERIES.items():
-        for keyword in keywords:
-            params = {
-                "search": keyword,
-                "filter": f"{date_filter_field}:{from_date},type:article",
-                "per-page": OPENALEX_PER_KEYWORD_LIMIT,
-                "sort": f"{sort_field}:desc",
-                "select": select,
-            }
+def fall_back_to_publication_date(date_state):
+    with date_state["lock"]:
+        if date_state["field"] == "created_date":
+            date_state["field"] = "publication_date"
+            metrics.count("openalex_date_fallback")
+            print("OpenAlex rejected from_created_date; falling back to from_publication_date.")
+
+def is_created_date_rejection(exc, date_field):
+    return (
+        exc.response is not None
+        and exc.response.status_code == 429
+        and date_field == "created_date"
+    )
 
+def fetch_with_date_fallback(description, fetch, date_state):
+    # fetch(date_field) returns a list of works. date_state is shared by all workers: once
+    # OpenAlex rejects from_created_date, every request that starts afterwards goes
+    # straight to from_publication_date.
+    date_field = date_state["field"]
+    try:
+        return fetch(date_field)
+    except requests.HTTPError as exc:
+        if is_created_date_rejection(exc, date_field):
+            fall_back_to_publication_date(date_state)
             try:
-                results = openalex_request(params).get("results", [])
-            except requests.HTTPError as exc:
-                if (
-                    exc.response is not None
-                    and exc.response.status_code == 429
-                    and date_filter_field == "from_created_date"
-                ):
-                    date_filter_field = "from_publication_date"
-                    sort_field = "publication_date"
-                    if not fallback_notice_printed:
-                        print("OpenAlex rejected from_created_date; falling back to from_publication_date.")
-                        fallback_notice_printed = True
-                    params["filter"] = f"{date_filter_field}:{from_date},type:article"
-                    params["sort"] = f"{sort_field}:desc"
-                    try:
-                        results = openalex_request(params).get("results", [])
-                    except requests.RequestException as fallback_exc:
-                        print(f"OpenAlex request failed for {query_name}/{keyword}: {fallback_exc}")
-                        continue
-                else:
-                    print(f"OpenAlex request failed for {query_name}/{keyword}: {exc}")
-                    continue
-            except requests.RequestException as exc:
-                print(f"OpenAlex request failed for {query_name}/{keyword}: {exc}")
-                continue
+                return fetch("publication_date")
+            except requests.RequestException as fallback_exc:
+                print(f"OpenAlex request failed for {description}: {fallback_exc}")
+                return []
+        print(f"OpenAlex request failed for {description}: {exc}")
+        return []
+    except requests.RequestException as exc:
+        print(f"OpenAlex request failed for {description}: {exc}")
+        return []
 
-            for work in results:
-                add_openalex_work(articles_by_key, work, query_name, keyword)
+def fetch_keyword_results(query_name, keyword, from_date, select, date_state):
+    return fetch_with_date_fallback(
+        f"{query_name}/{keyword}",
+        lambda date_field: openalex_request(
+            openalex_keyword_params(keyword, date_field, from_date, select)
+        ).get("results", []),
+        date_state,
+    )
 
-    articles = list(articles_by_key.values())
-    articles.sort(key=lambda x: x.get("created_date") or "", reverse=True)
-    return articles[:OPENALEX_MAX_ARTICLES]
+def iter_openalex_pages(params, cursor="*"):
+    # Cursor pagination: yields (results, next_cursor) per page until OpenAlex runs out.
+    # next_cursor is None on the last page; callers persist it to resume later.
+    params = dict(params)
+    while cursor:
+        params["cursor"] = cursor
+        data = openalex_request(params)
+        results = data.get("results", [])
+        cursor = (data.get("meta") or {}).get("next_cursor") if results else None
+        yield results, cursor
+
+def short_openalex_id(openalex_id):
+    return (openalex_id or "").rstrip("/").rsplit("/", 1)[-1]
+
+def fetch_heavy_fields(ids):
+    params = {
+        "filter": "openalex_id:" + "|".join(ids),
+        "per-page": len(ids),
+        "select": ",".join(["id"] + OPENALEX_HEAVY_FIELDS),
+    }
+    try:
+        return openalex_request(params).get("results", [])
+    except requests.RequestException as exc:
+        print(f"OpenAlex hydrate request failed for {len(ids)} works: {exc}")
+        return []
 
-openalex_articles = get_openalex_articles()
-print(f"Fetched {len(openalex_articles)} unique OpenAlex articles for scoring.")
+def hydrate_works(works):
+    # Fills in OPENALEX_HEAVY_FIELDS in place, OPENALEX_HYDRATE_BATCH works per request.
+    ids = list(dict.fromkeys(short_openalex_id(work.get("id")) for work in works if work.get("id")))
+    chunks = [ids[i:i + OPENALEX_HYDRATE_BATCH] for i in range(0, len(ids), OPENALEX_HYDRATE_BATCH)]
+
+    heavy_by_id = {}
+    with ThreadPoolExecutor(max_workers=OPENALEX_MAX_WORKERS) as executor:
+        for results in executor.map(fetch_heavy_fields, chunks):
+            for heavy in results:
+                heavy_by_id[short_openalex_id(heavy.get("id"))] = heavy
+
+    # A work whose hydrate request failed (after retries) is left without the heavy fields,
+    # so the hydrate_failed stage can count it instead of judging it on an empty abstract.
+    for work in works:
+        heavy = heavy_by_id.get(short_openalex_id(work.get("id")))
+        if heavy is None:
+            continue
+        for field in OPENALEX_HEAVY_FIELDS:
+            work.setdefault(field, heavy.get(field))
+
+def load_openalex_whitelist(path=None):
+    # {"sources": [(short_id, name)], "authors": [(short_id, name)]}; entries without an
+    # id (the "unresolved" block) are skipped.
+    path = pathlib.Path(path or OPENALEX_WHITELIST_PATH)
+    try:
+        config = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"Could not read OpenAlex whitelist {path}: {exc}")
+        return {"sources": [], "authors": []}
+    return {
+        kind: [
+            (short_openalex_id(entry["id"]), entry.get("name") or entry["id"])
+            for entry in config.get(kind) or []
+            if isinstance(entry, dict) and entry.get("id")
+        ]
+        for kind in ("sources", "authors")
+    }
 
-scored_articles = []
+def chunk_openalex_ids(ids, max_ids=None, max_chars=None):
+    # Splits ids into OR-filter values ("S1|S2|...") within both limits.
+    max_ids = max_ids or OPENALEX_WHITELIST_CHUNK_IDS
+    max_chars = max_chars or OPENALEX_WHITELIST_CHUNK_CHARS
+    chunks = []
+    chunk = []
+    length = 0
+    for openalex_id in ids:
+        if chunk and (len(chunk) >= max_ids or length + 1 + len(openalex_id) > max_chars):
+            chunks.append(chunk)
+            chunk = []
+            length = 0
+        length += len(openalex_id) + (1 if chunk else 0)
+        chunk.append(openalex_id)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def openalex_whitelist_params(filter_field, ids, date_field, from_date, select):
+    return {
+        "filter": f"{openalex_date_filter(date_field, from_date)},type:article,{filter_field}:{'|'.join(ids)}",
+        "per-page": OPENALEX_WHITELIST_PER_PAGE,
+        "select": select,
+    }
 
-for abstract_data in openalex_articles:
-    title = abstract_data["title"]
-    abstract_clean = strip_html(abstract_data["abstract"])
-    
-    research_score, reasoning_research, impact_score, reasoning_impact, topic_tags, method_tags = extract_scores_and_reasons(
-    title,
-    abstract_clean
+def fetch_whitelist_chunk(filter_field, ids, from_date, select, date_state):
+    def fetch(date_field):
+        params = openalex_whitelist_params(filter_field, ids, date_field, from_date, select)
+        works = []
+        for page, (results, _) in enumerate(iter_openalex_pages(params), start=1):
+            works.extend(results)
+            if page >= OPENALEX_WHITELIST_MAX_PAGES:
+                break
+        return works
+
+    return fetch_with_date_fallback(f"{filter_field} ({len(ids)} ids)", fetch, date_state)
+
+def label_whitelist_results(query_name, works, names_by_id):
+    # names_by_id maps an id to the (target, name) of every profile that whitelists it.
+    # One (target, query_name, name, [work]) entry per profile and whitelisted source or
+    # author a work matched, so each hit is labelled with the venue or person that brought it in.
+    labeled = []
+    for work in works:
+        if query_name == WHITELIST_SOURCE_QUERY:
+            matched = [short_openalex_id(work_source(work).get("id"))]
+        else:
+            matched = [
+                short_openalex_id((authorship.get("author") or {}).get("id"))
+                for authorship in work.get("authorships") or []
+            ]
+        for openalex_id in dict.fromkeys(matched):
+            for target, name in names_by_id.get(openalex_id, ()):
+                labeled.append((target, query_name, name, [work]))
+    return labeled
+
+def fetch_whitelist_results(from_date, select, date_state, executor, whitelists=None):
+    # whitelists maps a target to its whitelist. An id on several whitelists is fetched once.
+    if whitelists is None:
+        whitelists = {0: load_openalex_whitelist()}
+    jobs = []
+    for query_name, kind, filter_field in (
+        (WHITELIST_SOURCE_QUERY, "sources", "primary_location.source.id"),
+        (WHITELIST_AUTHOR_QUERY, "authors", "authorships.author.id"),
+    ):
+        names_by_id = {}
+        for target, whitelist in whitelists.items():
+            for openalex_id, name in whitelist.get(kind) or []:
+                names_by_id.setdefault(openalex_id, []).append((target, name))
+        # Author hits are labelled from their authorships, so those requests need them up front.
+        job_select = select if "authorships" in select.split(",") or kind == "sources" else f"{select},authorships"
+        for ids in chunk_openalex_ids(list(names_by_id)):
+            jobs.append((query_name, names_by_id, filter_field, ids, job_select))
+
+    # executor.map submits every request now; results are labelled as they are consumed.
+    batches = executor.map(
+        lambda job: fetch_whitelist_chunk(job[2], job[3], from_date, job[4], date_state),
+        jobs,
+    )
+    return (
+        labeled
+        for (query_name, names_by_id, _, _, _), works in zip(jobs, batches)
+        for labeled in label_whitelist_results(query_name, works, names_by_id)
     )
-    
-    doi = abstract_data["doi"]
-    journal = abstract_data["journal"]
 
-    scored_articles.append({
-        "title": title,
+def openalex_select(two_phase=None):
+    if two_phase is None:
+        two_phase = OPENALEX_TWO_PHASE
+    fields = OPENALEX_LIGHT_FIELDS if two_phase else OPENALEX_LIGHT_FIELDS + OPENALEX_HEAVY_FIELDS
+    return ",".join(fields)
+
+def iter_labeled_works(labeled_results):
+    for target, query_name, keyword, results in labeled_results:
+        for work in results:
+            yield target, query_name, keyword, work
+
+def iter_hydrated(labeled_works, chunk_size=None):
+    # A work that shows up in two chunks is hydrated twice; within a chunk ids are deduped.
+    chunk_size = chunk_size or OPENALEX_HYDRATE_CHUNK
+    chunk = []
+    for item in labeled_works:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            hydrate_works([item[-1] for item in chunk])
+            yield from chunk
+            chunk = []
+    if chunk:
+        hydrate_works([item[-1] for item in chunk])
+        yield from chunk
+
+def merge_openalex_results(targets, labeled_results, two_phase=None):
+    # targets holds one (pool, filter_stats, compiled_rules) per profile. labeled_results is
+    # an iterable of (target index, query_name, keyword, results), merged in that order as it
+    # is consumed; works pass through the target's filter stages into its pool one by one.
+    # A work fanned out to several targets is the same dict, so it is hydrated and its
+    # abstract decoded once.
+    if two_phase is None:
+        two_phase = OPENALEX_TWO_PHASE
+    works = iter_labeled_works(labeled_results)
+    if not two_phase:
+        for target, query_name, keyword, work in works:
+            pool, filter_stats, rules = targets[target]
+            add_openalex_work(pool, work, query_name, keyword, filter_stats, rules=rules)
+        return
+
+    survivors = (
+        (target, query_name, keyword, work)
+        for target, query_name, keyword, work in works
+        if run_filter_stages({"work": work, "query_name": query_name}, targets[target][1], METADATA_FILTER_STAGES)
+    )
+    for target, query_name, keyword, work in iter_hydrated(survivors):
+        pool, filter_stats, rules = targets[target]
+        add_openalex_work(pool, work, query_name, keyword, filter_stats, CONTENT_FILTER_STAGES, rules)
+
+def sweep_openalex(profiles, filter_stats, two_phase=None):
+    # One OpenAlex sweep for every profile: a keyword several profiles search for is
+    # fetched once (case-insensitively), as is a whitelisted id, and the results fan out to
+    # each profile's filters and candidate pool. filter_stats holds a FilterStats (or None)
+    # per profile. Returns the best candidates of each profile, in the order of profiles.
+    if two_phase is None:
+        two_phase = OPENALEX_TWO_PHASE
+    if OPENALEX_FETCH_MODE not in ("keywords", "whitelist", "both"):
+        raise SystemExit(f"OPENALEX_FETCH_MODE must be keywords, whitelist or both, not {OPENALEX_FETCH_MODE!r}")
+    limit = PRERANK_POOL_LIMIT if PRERANK else OPENALEX_MAX_ARTICLES
+    targets = [(CandidatePool(limit), stats, profile.compiled_rules) for profile, stats in zip(profiles, filter_stats)]
+    from_date = (datetime.now(timezone.utc) - timedelta(days=7)).date().isoformat()
+    date_state = {"field": "created_date", "lock": threading.Lock()}
+    select = openalex_select(two_phase)
+
+    # One job per distinct keyword, with the (target, query_name, keyword) it fans out to.
+    searches = {}
+    if OPENALEX_FETCH_MODE in ("keywords", "both"):
+        for target, profile in enumerate(profiles):
+            for query_name, keywords in profile.queries.items():
+                for keyword in keywords:
+                    searches.setdefault(keyword.strip().lower(), []).append((target, query_name, keyword))
+    jobs = list(searches.values())
+    if len(profiles) > 1:
+        requested = sum(len(labels) for labels in jobs)
+        print(f"Searching {len(jobs)} distinct keywords for {len(profiles)} profiles ({requested} requested).")
+
+    with ThreadPoolExecutor(max_workers=OPENALEX_MAX_WORKERS) as executor:
+        batches = executor.map(
+            lambda labels: fetch_keyword_results(labels[0][1], labels[0][2], from_date, select, date_state),
+            jobs,
+        )
+        # executor.map yields in submission order, so the merge is deterministic
+        # no matter which keyword finishes first.
+        labeled_results = (
+            (target, query_name, keyword, results)
+            for labels, results in zip(jobs, batches)
+            for target, query_name, keyword in labels
+        )
+        if OPENALEX_FETCH_MODE in ("whitelist", "both"):
+            whitelists = {
+                target: load_openalex_whitelist(profile.whitelist_path)
+                for target, profile in enumerate(profiles)
+                if profile.whitelist_path
+            }
+            labeled_results = itertools.chain(
+                labeled_results, fetch_whitelist_results(from_date, select, date_state, executor, whitelists)
+            )
+        merge_openalex_results(targets, labeled_results, two_phase)
+
+    for profile, (pool, _, _) in zip(profiles, targets):
+        prefix = f"[{profile.name}] " if len(profiles) > 1 else ""
+        print(f"{prefix}Kept the best {len(pool)} of {pool.seen} candidates by {CANDIDATE_PRIORITY}.")
+    return [pool.best() for pool, _, _ in targets]
+
+def build_scored_article(abstract_data, abstract_clean, scores):
+    research_score, reasoning_research, impact_score, reasoning_impact, topic_tags, method_tags = scores
+    return {
+        "title": abstract_data["title"],
         "authors": abstract_data.get("authors", []),
         "abstract": abstract_clean,
         "keywords": abstract_data.get("keywords", []),
@@ -637,80 +1450,821 @@ for abstract_data in openalex_articles:
         "reasoning_research": reasoning_research,
         "impact_score": impact_score,
         "reasoning_impact": reasoning_impact,
-        "doi": doi,
-        "journal": journal,
+        "doi": abstract_data["doi"],
+        "journal": abstract_data["journal"],
         "source_type": abstract_data.get("source_type", "N/A"),
         "created_date": abstract_data.get("created_date", "N/A"),
         "publication_date": abstract_data.get("publication_date", "N/A"),
         "openalex_id": abstract_data.get("openalex_id", "N/A"),
         "source_queries": abstract_data.get("source_queries", []),
         "matched_relevance_terms": abstract_data.get("matched_relevance_terms", []),
-    })
+    }
 
-issue_title = f"Weekly OpenAlex Literature Report - {datetime.now().strftime('%Y-%m-%d')}"
-issue_body = "Below are the OpenAlex article scores and reasoning from the past week:\n\n"
+def score_single(title, abstract_clean, prompt=None):
+    try:
+        return extract_scores_and_reasons(title, abstract_clean, prompt)
+    except Exception as exc:
+        # One failed or timed-out request should not throw away the rest of the run.
+        print(f"Scoring request failed for: {title}: {exc}")
+        return "N/A", "N/A", "N/A", "N/A", [], []
+
+def score_batch(batch, profile=None):
+    profile = profile or default_profile
+    cleaned = [strip_html(abstract_data["abstract"]) for abstract_data in batch]
+    batch_scores = [None] * len(batch)
+
+    if len(batch) > 1:
+        try:
+            batch_scores = extract_scores_batch([
+                (abstract_data["title"], abstract_clean)
+                for abstract_data, abstract_clean in zip(batch, cleaned)
+            ], profile.prompt)
+        except Exception as exc:
+            print(f"Batched scoring request failed for {len(batch)} articles: {exc}")
+
+    scored = []
+    for abstract_data, abstract_clean, scores in zip(batch, cleaned, batch_scores):
+        if scores is None:
+            scores = score_single(abstract_data["title"], abstract_clean, profile.prompt)
+        profile.score_cache.put(abstract_data["doi"], scores)
+        scored.append(build_scored_article(abstract_data, abstract_clean, scores))
+    return scored
+
+def score_articles(articles, max_workers=None, batch_size=None, on_scored=None, profile=None):
+    # on_scored, if given, is called on the main thread with each scored article as
+    # soon as it is ready (cache hits first, then in completion order).
+    profile = profile or default_profile
+    max_workers = max_workers or LLM_MAX_WORKERS
+    batch_size = batch_size or LLM_BATCH_SIZE
+    scored = [None] * len(articles)
+    misses = []
+    for index, abstract_data in enumerate(articles):
+        scores = profile.score_cache.get(abstract_data["doi"])
+        if scores is None:
+            misses.append(index)
+        else:
+            scored[index] = build_scored_article(abstract_data, strip_html(abstract_data["abstract"]), scores)
+            if on_scored:
+                on_scored(scored[index])
+
+    batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+    pending = {}
+
+    def collect(future):
+        for index, scored_article in zip(pending.pop(future), future.result()):
+            scored[index] = scored_article
+            if on_scored:
+                on_scored(scored_article)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in batches:
+            # Backpressure: never queue more than two requests per worker.
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending[executor.submit(score_batch, [articles[i] for i in batch], profile)] = batch
+
+        for future in as_completed(list(pending)):
+            collect(future)
+
+    return scored
+
+def write_snapshot(run_date, scored_articles, filter_stats, profile=None):
+    profile = profile or default_profile
+    profile.weekly_dir.mkdir(parents=True, exist_ok=True)
+
+    out_path = profile.weekly_dir / f"{run_date}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(scored_articles, f, ensure_ascii=False, indent=2)
+
+    # The snapshot file stays the source of truth; if this fails the next sync() picks it up.
+    try:
+        profile.history_store.record_snapshot(out_path, scored_articles)
+    except sqlite3.Error as exc:
+        print(f"Could not add {out_path} to the history store: {exc}")
+
+    filters_path = profile.weekly_dir / f"{run_date}.filters.json"
+    with open(filters_path, "w", encoding="utf-8") as f:
+        json.dump(filter_stats.as_dict(), f, ensure_ascii=False, indent=2)
+
+def write_metrics(run_date, profiles=None):
+    # One file per run, next to the built-in profile's snapshots; score cache counts are
+    # summed over profiles.
+    profiles = profiles or [default_profile]
+    WEEKLY_DIR.mkdir(parents=True, exist_ok=True)
+    metrics.set_cache(
+        "score",
+        sum(profile.score_cache.hits for profile in profiles),
+        sum(profile.score_cache.misses for profile in profiles),
+    )
+    for breaker in (openalex_breaker, llm_breaker, github_breaker):
+        if breaker.rejected:
+            metrics.count(f"{breaker.name}_circuit_rejected", breaker.rejected)
+    metrics_path = WEEKLY_DIR / f"{run_date}.metrics.json"
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.as_dict(), f, ensure_ascii=False, indent=2)
+
+def backfill_run_dates(start, end):
+    # Run dates from start to end, one week apart. Each covers the 7 days before it,
+    # the same window a scheduled run on that date would have used.
+    run_date = parse_openalex_date(start)
+    last = parse_openalex_date(end)
+    if not run_date or not last:
+        raise SystemExit("--backfill expects two dates as YYYY-MM-DD")
+    dates = []
+    while run_date <= last:
+        dates.append(run_date.isoformat())
+        run_date += timedelta(days=7)
+    return dates
+
+def load_backfill_state(path):
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"date_field": "created_date", "cursors": {}, "pages": {}, "articles": [], "seen": 0, "filters": None}
+    if isinstance(state.get("articles"), dict):
+        # Checkpoint written before candidates were pooled: articles keyed by DOI.
+        state["articles"] = list(state["articles"].values())
+    return state
+
+def save_backfill_state(path, state):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def backfill_keyword(state, state_path, pool, query_name, keyword, from_date, to_date, filter_stats, date_state):
+    label = f"{query_name}|{keyword}"
+    select = openalex_select()
+
+    while state["cursors"].get(label, "*") is not None:
+        date_field = date_state["field"]
+        params = openalex_keyword_params(
+            keyword, date_field, from_date, select, to_date=to_date, per_page=BACKFILL_PER_PAGE
+        )
+        try:
+            for results, next_cursor in iter_openalex_pages(params, state["cursors"].get(label, "*")):
+                merge_openalex_results([(pool, filter_stats, COMPILED_RULES)], [(0, query_name, keyword, results)])
+                state["articles"] = pool.items()
+                state["seen"] = pool.seen
+                pages = state["pages"].get(label, 0) + 1
+                state["pages"][label] = pages
+                state["cursors"][label] = next_cursor if pages < BACKFILL_MAX_PAGES else None
+                state["filters"] = filter_stats.as_dict()
+                save_backfill_state(state_path, state)
+                if state["cursors"][label] is None:
+                    break
+        except requests.HTTPError as exc:
+            if not is_created_date_rejection(exc, date_field):
+                raise
+            fall_back_to_publication_date(date_state)
+            state["date_field"] = date_state["field"]
+            state["cursors"][label] = "*"
+            state["pages"][label] = 0
+
+def backfill_week(run_date, force=False):
+    snapshot_path = WEEKLY_DIR / f"{run_date}.json"
+    if snapshot_path.exists() and not force:
+        try:
+            existing = json.loads(snapshot_path.read_text(encoding="utf-8"))
+        except ValueError:
+            existing = None
+        if existing:
+            print(f"Backfill {run_date}: snapshot already has {len(existing)} articles, skipping.")
+            return
+
+    end = parse_openalex_date(run_date)
+    from_date = (end - timedelta(days=7)).isoformat()
+    to_date = (end - timedelta(days=1)).isoformat()
+
+    # Cursors, merged candidates and filter counters are checkpointed after every page,
+    # so an interrupted backfill picks up where it stopped.
+    state_path = BACKFILL_STATE_DIR / f"{run_date}.json"
+    state = load_backfill_state(state_path)
+    filter_stats = FilterStats.from_dict(state["filters"]) if state.get("filters") else FilterStats()
+    date_state = {"field": state.get("date_field", "created_date"), "lock": threading.Lock()}
+    # Only the best OPENALEX_MAX_ARTICLES candidates are kept and checkpointed.
+    pool = CandidatePool(OPENALEX_MAX_ARTICLES).restore(state["articles"], state.get("seen"))
 
-if not scored_articles:
-    issue_body += "No articles matched the current filters this week.\n"
+    try:
+        for query_name, keywords in OPENALEX_QUERIES.items():
+            for keyword in keywords:
+                backfill_keyword(state, state_path, pool, query_name, keyword, from_date, to_date, filter_stats, date_state)
+    except requests.RequestException as exc:
+        print(f"Backfill {run_date}: OpenAlex request failed ({exc}); rerun to resume.")
+        return
 
-for article_data in scored_articles:
-    title = article_data["title"].strip()
-    authors = article_data.get("authors", [])
-    abstract = article_data.get("abstract", "").strip()
-    research_score = article_data["research_score"]
-    reasoning_research = article_data["reasoning_research"]
-    impact_score = article_data["impact_score"]
-    reasoning_impact = article_data["reasoning_impact"]
-    journal = article_data["journal"].strip()
-    publication_date = article_data.get("publication_date", "N/A")
-    source_queries = article_data.get("source_queries", [])
-    matched_relevance_terms = article_data.get("matched_relevance_terms", [])
-    doi = (article_data["doi"] or "N/A").strip()
-    doi_clean = doi.replace("doi:", "").replace("https://doi.org/", "").strip()
-    doi_link = f"https://doi.org/{doi_clean}" if doi_clean != "N/A" and "/" in doi_clean else doi
-    topic_tags = article_data.get("topic_tags", [])
-    method_tags = article_data.get("method_tags", [])
-    matched_filters = source_queries + [f"term:{term}" for term in matched_relevance_terms]
-
-    issue_body += f"- **Title**: {title}\n"
-    issue_body += f"  **Authors**: {', '.join(authors) if authors else 'N/A'}\n"
-    issue_body += f"  **Journal**: {journal}\n"
-    issue_body += f"  **Publication date**: {publication_date}\n"
-    issue_body += f"  **Keywords**: {', '.join(article_data.get('keywords', [])) if article_data.get('keywords') else 'N/A'}\n"
-    issue_body += f"  **Abstract**: {abstract if abstract else 'N/A'}\n"
-    issue_body += f"  **Research Score**: {research_score}\n"
-    issue_body += f"  **Impact Score**: {impact_score}\n"
-    issue_body += f"  **Reasoning**: Research: {reasoning_research} Impact: {reasoning_impact}\n"
-    issue_body += f"  **DOI**: {doi_link}\n"
-    openalex_id = article_data.get('openalex_id', 'N/A')
-    issue_body += f"  **OpenAlex**: {openalex_id}\n"
-    issue_body += f"  **Matched filters**: {', '.join(matched_filters) if matched_filters else 'N/A'}\n\n"
-
-def create_github_issue(title, body, access_token):
-    url = f"https://api.github.com/repos/JiangXY98/autoPsydecision/issues"
+    articles = pool.best()
+    print(f"Backfill {run_date}: {pool.seen} candidates, scoring {len(articles)}.")
+    write_snapshot(run_date, score_articles(articles), filter_stats)
+    state_path.unlink(missing_ok=True)
+
+def backfill(start, end, force=False):
+    run_dates = backfill_run_dates(start, end)
+    with ThreadPoolExecutor(max_workers=BACKFILL_MAX_WEEKS_IN_FLIGHT) as executor:
+        list(executor.map(lambda run_date: backfill_week(run_date, force), run_dates))
+
+# Weekly runs checkpoint under .cache/runs/<run_date>/: candidates.json once the fetch
+# is done, scored.jsonl one line per finished article, issue_posted once the issue is up.
+def profile_run_dir(run_date, profile=None):
+    # The built-in profile checkpoints in the run directory itself, others under profiles/<name>/.
+    run_dir = RUN_CHECKPOINT_DIR / run_date
+    if profile is None or profile.name == DEFAULT_PROFILE:
+        return run_dir
+    return run_dir / "profiles" / profile.name
+
+def latest_run_checkpoint():
+    run_dirs = sorted(path for path in RUN_CHECKPOINT_DIR.glob("????-??-??") if path.is_dir())
+    return run_dirs[-1] if run_dirs else None
+
+def run_unfinished(run_dir):
+    # Some profile fetched its candidates in this run but has not posted its issue yet.
+    profile_dirs = [run_dir] + sorted((run_dir / "profiles").glob("*"))
+    return any(
+        (profile_dir / "candidates.json").exists() and not (profile_dir / "issue_posted").exists()
+        for profile_dir in profile_dirs
+    )
+
+def resume_run_date(today):
+    # Today's run if it has a checkpoint, else the latest run if it is unfinished. A run
+    # that crashed during the fetch leaves no checkpoint, so it starts over with today's date
+    # rather than replaying an earlier, finished week.
+    latest = latest_run_checkpoint()
+    if (RUN_CHECKPOINT_DIR / today).is_dir() or latest is None or not run_unfinished(latest):
+        return today
+    return latest.name
+
+def prune_run_checkpoints(keep=RUN_CHECKPOINT_KEEP):
+    run_dirs = sorted(path for path in RUN_CHECKPOINT_DIR.glob("????-??-??") if path.is_dir())
+    for run_dir in run_dirs[:-keep]:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+def save_run_candidates(run_dir, articles, filter_stats):
+    run_dir.mkdir(parents=True, exist_ok=True)
+    prune_run_checkpoints()
+    tmp_path = run_dir / "candidates.tmp"
+    tmp_path.write_text(
+        json.dumps({"articles": articles, "filters": filter_stats.as_dict()}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, run_dir / "candidates.json")
+
+def load_run_candidates(run_dir):
+    try:
+        checkpoint = json.loads((run_dir / "candidates.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None, None
+    return checkpoint["articles"], FilterStats.from_dict(checkpoint["filters"])
+
+def load_scored_checkpoint(path):
+    scored_by_doi = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    scored_article = json.loads(line)
+                except ValueError:
+                    # A line cut short by the crash; that article is simply scored again.
+                    continue
+                scored_by_doi[normalize_doi(scored_article["doi"])] = scored_article
+    except OSError:
+        pass
+    return scored_by_doi
+
+def score_with_checkpoint(articles, scored_path, resume=False, profile=None):
+    done = load_scored_checkpoint(scored_path) if resume else {}
+    remaining = [a for a in articles if normalize_doi(a["doi"]) not in done]
+    if done:
+        print(f"Resuming: {len(articles) - len(remaining)} articles already scored, {len(remaining)} left.")
+
+    scored_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(scored_path, "a" if resume else "w", encoding="utf-8") as f:
+        def checkpoint_scored(scored_article):
+            # Fallback N/A results are not checkpointed, so --resume retries them.
+            if scored_article["research_score"] == "N/A" or scored_article["impact_score"] == "N/A":
+                return
+            f.write(json.dumps(scored_article, ensure_ascii=False) + "\n")
+            f.flush()
+
+        for scored_article in score_articles(remaining, on_scored=checkpoint_scored, profile=profile):
+            done[normalize_doi(scored_article["doi"])] = scored_article
+
+    return [done[normalize_doi(a["doi"])] for a in articles]
+
+def is_transient_github_error(outcome):
+    # Creating an issue is not idempotent, so only retry when GitHub cannot have acted on
+    # the request: no connection, throttled (including the secondary rate limit's 403 with
+    # Retry-After), or a gateway error. A read timeout or a 500 may already have created it.
+    if isinstance(outcome, requests.ReadTimeout):
+        return False
+    status = outcome_status(outcome)
+    if status == 403:
+        return bool(outcome.headers.get("Retry-After"))
+    if status == 500:
+        return False
+    return is_transient(outcome)
+
+def github_post(path, payload, access_token, what, repository=None):
+    # One POST to the GitHub API over the shared session; the parsed reply on 201, else None.
+    url = f"{GITHUB_API_URL}/repos/{repository or GITHUB_REPOSITORY}/{path}"
     headers = {
         "Authorization": f"token {access_token}",
         "Accept": "application/vnd.github.v3+json"
     }
-    payload = {
-        "title": title,
-        "body": body
-    }
 
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
+    def send():
+        start = time.perf_counter()
+        try:
+            response = http_session.post(url, headers=headers, data=json.dumps(payload), timeout=30)
+        except requests.RequestException as exc:
+            metrics.record_request("github", time.perf_counter() - start, type(exc).__name__)
+            raise
+        metrics.record_request("github", time.perf_counter() - start, response.status_code)
+        return response
+
+    try:
+        response = call_with_retries(
+            send, github_retry, github_breaker, retryable=is_transient_github_error, on_retry=retry_logger("GitHub", "github")
+        )
+    except requests.RequestException as exc:
+        print(f"Failed to create {what}:", exc)
+        return None
 
     if response.status_code == 201:
-        print("Issue created successfully!")
-    else:
-        print("Failed to create issue. Status code:", response.status_code)
-        print("Response:", response.text)
+        print(f"{what.capitalize()} created successfully!")
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    print(f"Failed to create {what}. Status code:", response.status_code)
+    print("Response:", response.text)
+    return None
+
+def create_github_issue(title, body, access_token, repository=None):
+    return github_post("issues", {"title": title, "body": body}, access_token, "issue", repository)
+
+def create_github_comment(issue_number, body, access_token, repository=None):
+    return github_post(
+        f"issues/{issue_number}/comments", {"body": body}, access_token, "comment", repository
+    ) is not None
+
+def fetch_stage(run_date, profiles=None, resume=False):
+    # {profile name: (candidates, filter_stats)}. A resumed run reuses every profile's
+    # checkpoint and sweeps only for the profiles without one (say, one added after the
+    # crash); the publish markers of a resumed checkpoint are left alone.
+    profiles = profiles or [default_profile]
+    fetched = {}
+    if resume:
+        for profile in profiles:
+            articles, filter_stats = load_run_candidates(profile_run_dir(run_date, profile))
+            if articles is not None:
+                print(f"Resuming {run_date}: {len(articles)} {profile.name} candidates from checkpoint.")
+                fetched[profile.name] = (articles, filter_stats)
+    missing = [profile for profile in profiles if profile.name not in fetched]
+    if not missing:
+        return fetched
+
+    all_stats = [FilterStats() for _ in missing]
+    for profile, articles, filter_stats in zip(missing, sweep_openalex(missing, all_stats), all_stats):
+        run_dir = profile_run_dir(run_date, profile)
+        save_run_candidates(run_dir, articles, filter_stats)
+        for name in ("issue_posted", "issue_progress.json", "issue.json"):
+            (run_dir / name).unlink(missing_ok=True)
+        print(f"Fetched {len(articles)} unique OpenAlex candidate articles for {profile.name}.")
+        fetched[profile.name] = (articles, filter_stats)
+    return fetched
+
+def score_stage(articles, run_dir, resume=False, profile=None):
+    profile = profile or default_profile
+    profile.score_cache.load()
+    scored_articles = score_with_checkpoint(articles, run_dir / "scored.jsonl", resume=resume, profile=profile)
+    profile.score_cache.compact()
+    print(f"Score cache: {profile.score_cache.hits} hits, {profile.score_cache.misses} misses.")
+    return scored_articles
+
+def merge_near_duplicate(kept, duplicate):
+    for field in ("source_queries", "matched_relevance_terms"):
+        for value in duplicate.get(field, []):
+            if value not in kept[field]:
+                kept[field].append(value)
+
+def dedupe_stage(articles, run_date, profile=None):
+    # Candidates come in CANDIDATE_PRIORITY order; of two near-copies the one ranked first
+    # is kept (the newer one under the default "recency").
+    # Earlier snapshots are those of the same profile. An earlier article with the same DOI
+    # is not a near-duplicate: it goes on to prerank, where the score cache picks it up.
+    if not NEAR_DUPLICATES:
+        return articles
+    profile = profile or default_profile
+    signatures = [signature(a["title"], strip_html(a.get("abstract") or "")) for a in articles]
+    try:
+        # Cheap when the store is current; rebuilds it when history.sqlite is missing.
+        profile.history_store.sync(profile.weekly_dir)
+        earlier = profile.history_store.near_duplicates(
+            signatures,
+            exclude_run_date=run_date,
+            exclude_dois=[normalize_doi(a["doi"]) for a in articles],
+            doi_key=normalize_doi,
+        )
+    except sqlite3.Error as exc:
+        print(f"Could not check the history store for near-duplicates: {exc}")
+        earlier = [None] * len(articles)
+
+    index = NearDuplicateIndex()
+    kept = []
+    for article, sig, match in zip(articles, signatures, earlier):
+        if match is not None:
+            print(
+                f"Skipping {article['doi']}: near-duplicate ({match['similarity']:.2f}) of "
+                f"{match['doi']} scored on {match['run_date']}."
+            )
+            metrics.count("near_duplicates_skipped")
+            continue
+        twin = index.query(sig) if sig is not None else None
+        if twin is not None:
+            print(f"Merging {article['doi']} into near-duplicate {kept[twin[0]]['doi']} ({twin[1]:.2f}).")
+            merge_near_duplicate(kept[twin[0]], article)
+            metrics.count("near_duplicates_merged")
+            continue
+        if sig is not None:
+            index.add(len(kept), sig)
+        kept.append(article)
+    return kept
+
+def prerank_text(article):
+    return f"{article.get('title') or ''} {strip_html(article.get('abstract') or '')}"
+
+def load_prerank_training(limit=None, weekly_dir=None):
+    # LLM-scored articles from past snapshots, newest first, as texts and
+    # (research, impact) targets.
+    limit = limit or PRERANK_MAX_TRAIN
+    weekly_dir = weekly_dir or WEEKLY_DIR
+    texts, targets = [], []
+    for path in sorted(weekly_dir.glob("????-??-??.json"), reverse=True):
+        try:
+            items = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            research_score = score_value(item.get("research_score"))
+            impact_score = score_value(item.get("impact_score"))
+            if research_score is None or impact_score is None:
+                continue
+            texts.append(prerank_text(item))
+            targets.append((research_score, impact_score))
+            if len(texts) >= limit:
+                return texts, targets
+    return texts, targets
+
+def prerank_articles(articles, profile=None):
+    # Returns the articles to score, in their original order, and one row per candidate
+    # for the sidecar (None when pre-ranking did not run). At most OPENALEX_MAX_ARTICLES are
+    # returned, so the LLM calls, snapshot and issue stay within it. Articles already in the
+    # score cache cost no LLM call and are kept first. The model learns from the profile's
+    # own scores.
+    profile = profile or default_profile
+    budget = OPENALEX_MAX_ARTICLES
+    if not PRERANK or not PRERANK_HAS_NUMPY or len(articles) <= budget:
+        return articles[:budget], None
+    texts, targets = load_prerank_training(weekly_dir=profile.weekly_dir)
+    if len(texts) < PRERANK_MIN_TRAIN:
+        print(f"Pre-ranking skipped: {len(texts)} scored articles to learn from, need {PRERANK_MIN_TRAIN}.")
+        return articles[:budget], None
+
+    predictions, novelty = PreRanker().fit(texts, targets).predict([prerank_text(a) for a in articles])
+    cached = [i for i, article in enumerate(articles) if profile.score_cache.contains(article["doi"])]
+    cached.sort(key=lambda i: -predictions[i].mean())
+    decisions = {i: "cached" for i in cached[:budget]}
+    uncached = [i for i in range(len(articles)) if i not in cached]
+    top, uncertain = select_for_scoring(
+        [predictions[i].mean() for i in uncached],
+        [novelty[i] for i in uncached],
+        budget - len(decisions),
+        PRERANK_MAX_UNCERTAIN,
+        PRERANK_NOVELTY_THRESHOLD,
+    )
+    decisions.update({uncached[i]: "top_k" for i in top})
+    decisions.update({uncached[i]: "uncertain" for i in uncertain})
+
+    rows = [
+        {
+            "doi": article["doi"],
+            "title": article["title"],
+            "journal": article.get("journal"),
+            "openalex_id": article.get("openalex_id"),
+            "predicted_research_score": round(float(predictions[i][0]), 1),
+            "predicted_impact_score": round(float(predictions[i][1]), 1),
+            "novelty": round(float(novelty[i]), 3),
+            "decision": decisions.get(i, "predicted_only"),
+        }
+        for i, article in enumerate(articles)
+    ]
+    return [article for i, article in enumerate(articles) if i in decisions], rows
+
+def prerank_stage(articles, run_date, resume=False, profile=None):
+    # The sidecar doubles as the checkpoint: a resumed run scores the same selection even
+    # though the articles scored before the crash are now in the score cache.
+    profile = profile or default_profile
+    prerank_path = profile.weekly_dir / f"{run_date}.prerank.json"
+    if resume and prerank_path.exists():
+        try:
+            rows = json.loads(prerank_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            rows = None
+        if rows is not None:
+            chosen = {normalize_doi(row["doi"]) for row in rows if row["decision"] != "predicted_only"}
+            selected = [a for a in articles if normalize_doi(a["doi"]) in chosen]
+            print(f"Resuming pre-ranking: scoring {len(selected)} of {len(articles)} candidates.")
+            return selected
+
+    profile.score_cache.load()
+    selected, rows = prerank_articles(articles, profile)
+    if rows is None:
+        prerank_path.unlink(missing_ok=True)
+        return selected
+
+    profile.weekly_dir.mkdir(parents=True, exist_ok=True)
+    with open(prerank_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+    skipped = len(articles) - len(selected)
+    metrics.count("prerank_predicted_only", skipped)
+    print(f"Pre-ranking: scoring {len(selected)} of {len(articles)} candidates; {skipped} kept as predictions only.")
+    return selected
+
+ISSUE_HEADER = "Below are the OpenAlex article scores and reasoning from the past week:\n\n"
+ISSUE_EMPTY = "No articles matched the current filters this week.\n"
+ARTICLE_TEMPLATE = (
+    "- **Title**: {title}\n"
+    "  **Authors**: {authors}\n"
+    "  **Journal**: {journal}\n"
+    "  **Publication date**: {publication_date}\n"
+    "  **Keywords**: {keywords}\n"
+    "  **Abstract**: {abstract}\n"
+    "  **Research Score**: {research_score}\n"
+    "  **Impact Score**: {impact_score}\n"
+    "  **Reasoning**: Research: {reasoning_research} Impact: {reasoning_impact}\n"
+    "  **DOI**: {doi}\n"
+    "  **OpenAlex**: {openalex_id}\n"
+    "  **Matched filters**: {matched_filters}\n\n"
+)
+TRUNCATED_NOTE = "\n  _(truncated: this entry does not fit in one GitHub comment)_\n\n"
+
+def render_article(article_data):
+    doi = (article_data["doi"] or "N/A").strip()
+    doi_clean = doi.replace("doi:", "").replace("https://doi.org/", "").strip()
+    authors = article_data.get("authors", [])
+    keywords = article_data.get("keywords") or []
+    abstract = article_data.get("abstract", "").strip()
+    matched_filters = article_data.get("source_queries", []) + [
+        f"term:{term}" for term in article_data.get("matched_relevance_terms", [])
+    ]
+    return ARTICLE_TEMPLATE.format(
+        title=article_data["title"].strip(),
+        authors=", ".join(authors) if authors else "N/A",
+        journal=article_data["journal"].strip(),
+        publication_date=article_data.get("publication_date", "N/A"),
+        keywords=", ".join(keywords) if keywords else "N/A",
+        abstract=abstract if abstract else "N/A",
+        research_score=article_data["research_score"],
+        impact_score=article_data["impact_score"],
+        reasoning_research=article_data["reasoning_research"],
+        reasoning_impact=article_data["reasoning_impact"],
+        doi=f"https://doi.org/{doi_clean}" if doi_clean != "N/A" and "/" in doi_clean else doi,
+        openalex_id=article_data.get("openalex_id", "N/A"),
+        matched_filters=", ".join(matched_filters) if matched_filters else "N/A",
+    )
+
+def paginate(header, blocks, limit=None):
+    # Packs blocks into pages of at most `limit` characters (less the room kept for the
+    # part notes), starting a new page rather than splitting a block. A block too big
+    # for any page is truncated.
+    limit = (limit or ISSUE_PAGE_LIMIT) - ISSUE_PAGE_NOTE_ROOM
+    page, size, filled = [header], len(header), False
+    for block in blocks:
+        if len(block) > limit - len(header):
+            block = block[:limit - len(header) - len(TRUNCATED_NOTE)] + TRUNCATED_NOTE
+        if filled and size + len(block) > limit:
+            yield "".join(page)
+            page, size = [], 0
+        page.append(block)
+        size += len(block)
+        filled = True
+    yield "".join(page)
+
+def render_issue(run_date, scored_articles, limit=None, profile=None):
+    # Returns the issue title and its pages: the first is the issue body, any others
+    # are posted as comments on it.
+    issue_title = f"Weekly OpenAlex Literature Report - {run_date}"
+    if profile is not None and profile.name != DEFAULT_PROFILE:
+        issue_title = f"Weekly OpenAlex Literature Report ({profile.name}) - {run_date}"
+    blocks = (render_article(a) for a in scored_articles) if scored_articles else [ISSUE_EMPTY]
+    pages = list(paginate(ISSUE_HEADER, blocks, limit))
+    if len(pages) > 1:
+        pages[0] += f"_Continued in the comments below (part 1 of {len(pages)})._\n"
+        pages[1:] = [f"_Part {i} of {len(pages)}._\n\n{page}" for i, page in enumerate(pages[1:], start=2)]
+    return issue_title, pages
+
+def render_stage(run_dir, run_date, scored_articles, resume=False, profile=None):
+    # The rendered pages are kept with the run, so a failed post can be retried
+    # (--publish-only) without re-rendering.
+    issue_path = run_dir / "issue.json"
+    if resume:
+        rendered = load_rendered_issue(run_dir)
+        if rendered is not None:
+            return rendered["title"], rendered["pages"]
+    issue_title, pages = render_issue(run_date, scored_articles, profile=profile)
+    repository = profile.repository if profile is not None else GITHUB_REPOSITORY
+    run_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = issue_path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"title": issue_title, "pages": pages, "repository": repository}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, issue_path)
+    if len(pages) > 1:
+        print(f"Issue body is {sum(map(len, pages))} characters; posting it as 1 issue + {len(pages) - 1} comments.")
+    return issue_title, pages
 
-create_github_issue(issue_title, issue_body, access_token)
+def load_rendered_issue(run_dir):
+    try:
+        return json.loads((run_dir / "issue.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
 
-run_date = datetime.now().strftime("%Y-%m-%d")
-out_dir = pathlib.Path("data/weekly")
-out_dir.mkdir(parents=True, exist_ok=True)
+def load_issue_progress(run_dir):
+    try:
+        return json.loads((run_dir / "issue_progress.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"number": None, "pages_posted": 0}
+
+def save_issue_progress(run_dir, progress):
+    tmp_path = run_dir / "issue_progress.tmp"
+    tmp_path.write_text(json.dumps(progress), encoding="utf-8")
+    os.replace(tmp_path, run_dir / "issue_progress.json")
+
+def publish_issue(run_dir, run_date, issue_title, pages, repository=None):
+    # Progress is saved after every page, so a retry posts only what is missing and
+    # never opens a second issue.
+    issue_posted_path = run_dir / "issue_posted"
+    if issue_posted_path.exists():
+        print(f"Issue for {run_date} was already posted; not posting it again.")
+        return True
 
-out_path = out_dir / f"{run_date}.json"
-with open(out_path, "w", encoding="utf-8") as f:
-    json.dump(scored_articles, f, ensure_ascii=False, indent=2)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    progress = load_issue_progress(run_dir)
+    if progress["number"] is None:
+        issue = create_github_issue(issue_title, pages[0], access_token, repository)
+        if issue is None:
+            return False
+        if issue.get("number") is None:
+            # Without the number the comments have nowhere to go and a retry cannot tell
+            # the issue exists; save nothing and report the post as failed.
+            print("GitHub did not return the new issue's number; not recording it as posted.")
+            return False
+        progress = {"number": issue.get("number"), "url": issue.get("html_url"), "pages_posted": 1}
+        save_issue_progress(run_dir, progress)
+
+    for index in range(progress["pages_posted"], len(pages)):
+        if not create_github_comment(progress["number"], pages[index], access_token, repository):
+            print(
+                f"Posted {index} of {len(pages)} pages to issue #{progress['number']}; "
+                "rerun with --publish-only to post the rest."
+            )
+            return False
+        progress["pages_posted"] = index + 1
+        save_issue_progress(run_dir, progress)
+
+    issue_posted_path.touch()
+    return True
+
+def run_profile(profile, run_date, articles, filter_stats, resume=False):
+    run_dir = profile_run_dir(run_date, profile)
+    with metrics.span("dedupe"):
+        articles = dedupe_stage(articles, run_date, profile)
+    with metrics.span("prerank"):
+        articles = prerank_stage(articles, run_date, resume, profile)
+    with metrics.span("score"):
+        scored_articles = score_stage(articles, run_dir, resume, profile)
+    # The snapshot goes to disk before the issue is posted, so a failed post loses nothing.
+    with metrics.span("snapshot"):
+        write_snapshot(run_date, scored_articles, filter_stats, profile)
+    with metrics.span("render"):
+        issue_title, pages = render_stage(run_dir, run_date, scored_articles, resume, profile)
+    with metrics.span("publish"):
+        publish_issue(run_dir, run_date, issue_title, pages, profile.repository)
+
+def run_weekly(resume=False):
+    run_date = datetime.now().strftime("%Y-%m-%d")
+    if resume:
+        run_date = resume_run_date(run_date)
+    profiles = load_profiles()
+
+    # Metrics are written even when a stage fails, so a crashed run still shows where it got to.
+    try:
+        # One fetch for all profiles; everything after it runs per profile.
+        with metrics.span("fetch"):
+            fetched = fetch_stage(run_date, profiles, resume)
+        for profile in profiles:
+            if len(profiles) > 1:
+                print(f"=== Profile {profile.name} ===")
+            articles, filter_stats = fetched[profile.name]
+            run_profile(profile, run_date, articles, filter_stats, resume)
+    finally:
+        write_metrics(run_date, profiles)
+
+def dispatch(args):
+    prune_openalex_cache()
+    if args.backfill:
+        score_cache.load()
+        backfill(*args.backfill, force=args.force)
+        score_cache.compact()
+    elif args.fetch_only:
+        run_date = datetime.now().strftime("%Y-%m-%d")
+        fetched = fetch_stage(run_date, load_profiles())
+        if len(fetched) == 1:
+            print(json.dumps(fetched[DEFAULT_PROFILE][1].as_dict(), indent=2))
+        else:
+            print(json.dumps({name: stats.as_dict() for name, (_, stats) in fetched.items()}, indent=2))
+    elif args.render_only:
+        rendered = []
+        for profile in load_profiles():
+            snapshot_path = profile.weekly_dir / f"{args.render_only}.json"
+            if snapshot_path.exists():
+                scored_articles = json.loads(snapshot_path.read_text(encoding="utf-8"))
+                rendered.append(render_issue(args.render_only, scored_articles, profile=profile))
+        if not rendered:
+            raise SystemExit(f"No snapshot for {args.render_only}.")
+        print("\n<!-- next issue -->\n".join("\n<!-- next comment -->\n".join(pages) for _, pages in rendered))
+    elif args.publish_only is not None:
+        run_dir = RUN_CHECKPOINT_DIR / args.publish_only if args.publish_only else latest_run_checkpoint()
+        # The built-in profile's issue, then those under profiles/<name>/.
+        run_dirs = [run_dir] + sorted((run_dir / "profiles").glob("*")) if run_dir else []
+        published = []
+        for profile_dir in run_dirs:
+            rendered = load_rendered_issue(profile_dir)
+            if rendered is not None:
+                published.append((profile_dir, rendered))
+        if not published:
+            raise SystemExit(f"No rendered issue to publish in {run_dir or RUN_CHECKPOINT_DIR}.")
+        for profile_dir, rendered in published:
+            publish_issue(profile_dir, run_dir.name, rendered["title"], rendered["pages"], rendered.get("repository"))
+    else:
+        run_weekly(resume=args.resume)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weekly OpenAlex literature scoring.")
+    parser.add_argument(
+        "--backfill",
+        nargs=2,
+        metavar=("FROM", "TO"),
+        help="write snapshots for every run date from FROM to TO (YYYY-MM-DD, one week apart) instead of the weekly run",
+    )
+    parser.add_argument("--force", action="store_true", help="with --backfill, overwrite non-empty snapshots")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue today's run or the latest unfinished one: reuse its candidates and finished scores",
+    )
+    parser.add_argument(
+        "--fetch-only",
+        action="store_true",
+        help="fetch and filter this week's candidates into the run checkpoint, without scoring",
+    )
+    parser.add_argument(
+        "--render-only",
+        metavar="RUN_DATE",
+        help="print the issue markdown for an existing data/weekly/<RUN_DATE>.json",
+    )
+    parser.add_argument(
+        "--publish-only",
+        nargs="?",
+        const="",
+        metavar="RUN_DATE",
+        help="post the already rendered issue of a run (default: the latest) without fetching or scoring",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run under cProfile; stats go to .cache/runs/<date>/profile.pstats and the top calls are printed",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.profile:
+        return dispatch(args)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(dispatch, args)
+    finally:
+        profile_path = RUN_CHECKPOINT_DIR / datetime.now().strftime("%Y-%m-%d") / "profile.pstats"
+        profile_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        print(f"Profile written to {profile_path}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+if __name__ == "__main__":
+    main()